@@ -0,0 +1,403 @@
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+import fitz
+
+try:
+    from .converter import ConversionOptions, PdfToPptConverter, _flatten_path_to_points
+    from .metrics import peak_rss_bytes
+except ImportError:
+    from converter import ConversionOptions, PdfToPptConverter, _flatten_path_to_points
+    from metrics import peak_rss_bytes
+
+
+STAGES = ("extract_texts", "extract_images", "extract_vectors", "cluster_vectors", "flatten_paths", "build_pptx")
+PAGE_W = 842.0
+PAGE_H = 595.0
+
+
+def _new_document() -> fitz.Document:
+    return fitz.open()
+
+
+def _new_page(document: fitz.Document) -> fitz.Page:
+    return document.new_page(width=PAGE_W, height=PAGE_H)
+
+
+def _draw_text_lines(page: fitz.Page, rng: random.Random, lines: int) -> None:
+    words = ["alpha", "beta", "gamma", "delta", "vector", "slide", "report", "页面", "图标", "文本"]
+    y = 30.0
+    for _ in range(lines):
+        size = rng.choice([7.0, 8.0, 9.0, 10.0, 12.0])
+        text = " ".join(rng.choice(words) for _ in range(rng.randint(6, 14)))
+        font = "china-s" if any(ord(ch) > 127 for ch in text) else rng.choice(["helv", "tiro", "cour"])
+        page.insert_text((30.0, y), text, fontsize=size, fontname=font, color=(rng.random() * 0.4, 0, 0))
+        y += size * 1.4
+        if y > PAGE_H - 30:
+            break
+
+
+def _make_pixmap(rng: random.Random, size: int) -> fitz.Pixmap:
+    base = (rng.randint(0, 255), rng.randint(0, 255), rng.randint(0, 255))
+    samples = bytearray(size * size * 3)
+    for y in range(size):
+        for x in range(size):
+            offset = (y * size + x) * 3
+            samples[offset] = (base[0] + x) & 255
+            samples[offset + 1] = (base[1] + y) & 255
+            samples[offset + 2] = (base[2] + ((x ^ y) & 63)) & 255
+    return fitz.Pixmap(fitz.csRGB, size, size, bytes(samples), False)
+
+
+def _draw_small_icon(page: fitz.Page, rng: random.Random, x: float, y: float, size: float) -> None:
+    shape = page.new_shape()
+    shape.draw_rect(fitz.Rect(x, y, x + size, y + size))
+    shape.finish(color=(0, 0, 0), fill=(rng.random(), rng.random(), rng.random()), width=0.5)
+    shape.draw_circle(fitz.Point(x + size / 2, y + size / 2), size / 3)
+    shape.finish(color=(0.2, 0.2, 0.2), fill=(1, 1, 1), width=0.5)
+    shape.draw_line(fitz.Point(x, y + size), fitz.Point(x + size, y))
+    shape.finish(color=(0.8, 0, 0), width=0.75)
+    shape.commit()
+
+
+def _draw_curve_icon(page: fitz.Page, rng: random.Random, center: fitz.Point, radius: float, curves: int) -> None:
+    shape = page.new_shape()
+    start = fitz.Point(center.x + radius, center.y)
+    shape.draw_line(start, start)
+    current = start
+    for idx in range(1, curves + 1):
+        angle = (idx / curves) * 6.283185307
+        end = fitz.Point(center.x + radius * math.cos(angle), center.y + radius * math.sin(angle))
+        c1 = fitz.Point(current.x + rng.uniform(-8, 8), current.y + rng.uniform(-8, 8))
+        c2 = fitz.Point(end.x + rng.uniform(-8, 8), end.y + rng.uniform(-8, 8))
+        shape.draw_bezier(current, c1, c2, end)
+        current = end
+    shape.finish(color=(0, 0, 0.4), fill=(0.3, 0.6, 0.9), width=0.6, closePath=True)
+    shape.commit()
+
+
+def gen_text_dense(pages: int, seed: int) -> bytes:
+    rng = random.Random(seed)
+    document = _new_document()
+    for _ in range(pages):
+        _draw_text_lines(_new_page(document), rng, lines=60)
+    return _save(document)
+
+
+def gen_image_heavy(pages: int, seed: int) -> bytes:
+    rng = random.Random(seed)
+    document = _new_document()
+    pixmaps = [_make_pixmap(rng, 256) for _ in range(6)]
+    for _ in range(pages):
+        page = _new_page(document)
+        for row in range(3):
+            for col in range(4):
+                x0 = 20 + col * 205
+                y0 = 20 + row * 190
+                page.insert_image(fitz.Rect(x0, y0, x0 + 190, y0 + 175), pixmap=rng.choice(pixmaps))
+    return _save(document)
+
+
+def gen_many_small_vectors(pages: int, seed: int) -> bytes:
+    rng = random.Random(seed)
+    document = _new_document()
+    for _ in range(pages):
+        page = _new_page(document)
+        for row in range(14):
+            for col in range(20):
+                _draw_small_icon(page, rng, 20 + col * 40, 20 + row * 40, rng.uniform(10, 22))
+    return _save(document)
+
+
+def gen_huge_curve_icons(pages: int, seed: int) -> bytes:
+    rng = random.Random(seed)
+    document = _new_document()
+    for _ in range(pages):
+        page = _new_page(document)
+        for row in range(2):
+            for col in range(4):
+                center = fitz.Point(110 + col * 200, 150 + row * 290)
+                _draw_curve_icon(page, rng, center, radius=80, curves=120)
+    return _save(document)
+
+
+def gen_long_document(pages: int, seed: int) -> bytes:
+    rng = random.Random(seed)
+    document = _new_document()
+    pixmap = _make_pixmap(rng, 128)
+    for index in range(pages):
+        page = _new_page(document)
+        _draw_text_lines(page, rng, lines=20)
+        if index % 3 == 0:
+            page.insert_image(fitz.Rect(500, 300, 800, 560), pixmap=pixmap)
+        for col in range(6):
+            _draw_small_icon(page, rng, 40 + col * 60, 480, 18)
+    return _save(document)
+
+
+def _save(document: fitz.Document) -> bytes:
+    try:
+        return document.tobytes(garbage=3, deflate=True)
+    finally:
+        document.close()
+
+
+GENERATORS: dict[str, tuple[Callable[[int, int], bytes], int]] = {
+    "text_dense": (gen_text_dense, 20),
+    "image_heavy": (gen_image_heavy, 10),
+    "many_small_vectors": (gen_many_small_vectors, 4),
+    "huge_curve_icons": (gen_huge_curve_icons, 2),
+    "long_document": (gen_long_document, 200),
+}
+
+
+def run_stages(pdf_bytes: bytes, options: ConversionOptions) -> dict[str, Any]:
+    converter = PdfToPptConverter(options)
+    timings = {stage: 0.0 for stage in STAGES}
+    document = fitz.open(stream=pdf_bytes, filetype="pdf")
+
+    try:
+        extracted_pages = []
+        for index in range(len(document)):
+            page = document[index]
+            page_w = float(page.rect.width)
+            page_h = float(page.rect.height)
+            page_area = max(1.0, page_w * page_h)
+
+            started = time.perf_counter()
+            texts = converter._extract_texts(page, page_w, page_h)
+            timings["extract_texts"] += time.perf_counter() - started
+
+            started = time.perf_counter()
+            images = converter._extract_images(page, document, page_w, page_h)
+            timings["extract_images"] += time.perf_counter() - started
+
+            started = time.perf_counter()
+            vectors = converter._extract_vectors(page, page_area)
+            timings["extract_vectors"] += time.perf_counter() - started
+
+            started = time.perf_counter()
+            icons = converter._build_icon_candidates(vectors, page_w, page_h)
+            timings["cluster_vectors"] += time.perf_counter() - started
+
+            started = time.perf_counter()
+            for icon in icons:
+                for path in icon["paths"]:
+                    # _build_pptx reuses the cached result, so build_pptx does not time flattening again.
+                    path["flattened"] = _flatten_path_to_points(
+                        path["items"], path["close_path"], options.vector_tolerance_pt
+                    )
+            timings["flatten_paths"] += time.perf_counter() - started
+
+            extracted_pages.append(
+                {
+                    "page_no": index + 1,
+                    "page_w": page_w,
+                    "page_h": page_h,
+                    "texts": texts,
+                    "images": images,
+                    "vectors": vectors,
+                    "icons": icons,
+                }
+            )
+
+        report: dict[str, Any] = {
+            "vector_icons_ok": 0,
+            "vector_icons_fallback": 0,
+            "raster_icons": 0,
+            "warnings": [],
+            "icons": [],
+        }
+        started = time.perf_counter()
+        pptx_bytes = converter._build_pptx(document, extracted_pages, report, lambda *_: None)
+        timings["build_pptx"] += time.perf_counter() - started
+
+        return {
+            "pages": len(document),
+            "timings": timings,
+            "output_bytes": len(pptx_bytes),
+            "icons": report["vector_icons_ok"] + report["vector_icons_fallback"] + report["raster_icons"],
+        }
+    finally:
+        document.close()
+
+
+def _measure_peak_rss(pdf_bytes: bytes, options: ConversionOptions) -> int | None:
+    run_stages(pdf_bytes, options)
+    return peak_rss_bytes()
+
+
+def measure_peak_rss(pdf_bytes: bytes, options: ConversionOptions) -> int | None:
+    """Run one conversion in a fresh process and return that process's peak RSS.
+
+    Unlike tracemalloc this includes MuPDF's native allocations; a new process keeps
+    earlier cases from raising the high-water mark.
+    """
+    with multiprocessing.get_context("spawn").Pool(processes=1) as pool:
+        return pool.apply(_measure_peak_rss, (pdf_bytes, options))
+
+
+def benchmark_case(name: str, pages: int, repeat: int, seed: int, options: ConversionOptions) -> dict[str, Any]:
+    generator, _ = GENERATORS[name]
+    pdf_bytes = generator(pages, seed)
+
+    runs = [run_stages(pdf_bytes, options) for _ in range(repeat)]
+    stage_times = {stage: statistics.median(run["timings"][stage] for run in runs) for stage in STAGES}
+    total = sum(stage_times.values())
+
+    tracemalloc.start()
+    try:
+        run_stages(pdf_bytes, options)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    peak_rss = measure_peak_rss(pdf_bytes, options)
+
+    return {
+        "pages": runs[0]["pages"],
+        "input_bytes": len(pdf_bytes),
+        "output_bytes": runs[0]["output_bytes"],
+        "icons": runs[0]["icons"],
+        "stages_s": {stage: round(value, 6) for stage, value in stage_times.items()},
+        "total_s": round(total, 6),
+        "pages_per_s": round(runs[0]["pages"] / total, 3) if total > 0 else None,
+        "peak_py_mem_bytes": peak,
+        "peak_rss_bytes": peak_rss,
+    }
+
+
+def compare_build(pages: int, seed: int, workers: int, chunk_pages: int) -> dict[str, Any]:
+    """Time end-to-end ``convert`` with the single-process build and the chunked parallel build."""
+    pdf_bytes = gen_long_document(pages, seed)
+    timings = {}
+    for label, build_workers in (("single", 0), ("chunked", workers)):
+        options = ConversionOptions(build_workers=build_workers, chunk_pages=chunk_pages)
+        started = time.perf_counter()
+        artifacts = PdfToPptConverter(options).convert(pdf_bytes, lambda *_: None)
+        timings[label] = {
+            "total_s": round(time.perf_counter() - started, 6),
+            "output_bytes": len(artifacts.pptx_bytes),
+        }
+    timings["speedup"] = round(timings["single"]["total_s"] / max(timings["chunked"]["total_s"], 1e-9), 3)
+    return {"pages": pages, "workers": workers, "chunk_pages": chunk_pages, **timings}
+
+
+def compare(
+    results: dict[str, Any],
+    baseline: dict[str, Any],
+    threshold: float,
+    min_seconds: float,
+) -> list[str]:
+    regressions = []
+    for name, case in results["cases"].items():
+        base_case = baseline.get("cases", {}).get(name)
+        if not base_case:
+            continue
+
+        metrics = [(stage, case["stages_s"][stage], base_case["stages_s"].get(stage), True) for stage in STAGES]
+        metrics.append(("total", case["total_s"], base_case.get("total_s"), True))
+        metrics.append(("peak_mem", case["peak_rss_bytes"], base_case.get("peak_rss_bytes"), False))
+        metrics.append(("output", case["output_bytes"], base_case.get("output_bytes"), False))
+
+        for metric, current, previous, is_time in metrics:
+            if not previous or current is None:
+                continue
+            delta = (current - previous) / previous
+            # Stages that take a few milliseconds are dominated by timer noise.
+            noisy = is_time and max(current, previous) < min_seconds
+            marker = ""
+            if delta > threshold and not noisy:
+                marker = "  <-- regression"
+                regressions.append(f"{name}.{metric}")
+            print(f"  {name:<20} {metric:<16} {previous:>14.4f} -> {current:>14.4f}  {delta:+7.1%}{marker}")
+    return regressions
+
+
+def _print_case(name: str, case: dict[str, Any]) -> None:
+    print(
+        f"{name}: {case['pages']} pages, {case['pages_per_s']} pages/s, "
+        f"peak RSS {_format_mb(case['peak_rss_bytes'])}, Python heap {_format_mb(case['peak_py_mem_bytes'])}, output {case['output_bytes'] / 1e3:.1f} KB"
+    )
+    for stage in STAGES:
+        print(f"    {stage:<16} {case['stages_s'][stage]:.4f}s")
+
+
+def _format_mb(value: int | None) -> str:
+    return "n/a" if value is None else f"{value / 1e6:.1f} MB"
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the PDF->PPTX pipeline stage by stage on synthetic PDFs.")
+    parser.add_argument("--cases", nargs="*", choices=sorted(GENERATORS), default=sorted(GENERATORS))
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply the default page count of every case")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case; the median is reported")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", type=Path, help="Write results as JSON to this file")
+    parser.add_argument("--baseline", type=Path, help="Compare against a previously written results file")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative slowdown flagged as regression")
+    parser.add_argument("--min-seconds", type=float, default=0.02, help="Ignore timing deltas below this duration")
+    parser.add_argument("--compare-build", action="store_true", help="Compare single-process and chunked builds")
+    parser.add_argument("--build-pages", type=int, default=500, help="Pages of the --compare-build document")
+    parser.add_argument("--build-workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--chunk-pages", type=int, default=50)
+    parser.add_argument("--dump-pdfs", type=Path, help="Also write the generated PDFs into this directory")
+    args = parser.parse_args(argv)
+
+    options = ConversionOptions()
+    results: dict[str, Any] = {
+        "version": "1.0",
+        "seed": args.seed,
+        "scale": args.scale,
+        "python": sys.version.split()[0],
+        "pymupdf": fitz.VersionBind,
+        "cases": {},
+    }
+
+    for name in args.cases:
+        generator, default_pages = GENERATORS[name]
+        pages = max(1, int(round(default_pages * args.scale)))
+        if args.dump_pdfs:
+            args.dump_pdfs.mkdir(parents=True, exist_ok=True)
+            (args.dump_pdfs / f"{name}.pdf").write_bytes(generator(pages, args.seed))
+
+        case = benchmark_case(name, pages, max(1, args.repeat), args.seed, options)
+        results["cases"][name] = case
+        _print_case(name, case)
+
+    if args.compare_build:
+        build = compare_build(args.build_pages, args.seed, args.build_workers, args.chunk_pages)
+        results["build_comparison"] = build
+        print(
+            f"build comparison ({build['pages']} pages, {build['workers']} workers, {build['chunk_pages']} pages/chunk): "
+            f"single {build['single']['total_s']:.2f}s, chunked {build['chunked']['total_s']:.2f}s, "
+            f"speedup x{build['speedup']}"
+        )
+
+    if args.output:
+        args.output.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        print(f"Compared with {args.baseline}:")
+        regressions = compare(results, baseline, args.threshold, args.min_seconds)
+        if regressions:
+            print(f"Regressions over {args.threshold:.0%}: {', '.join(regressions)}")
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,11 +1,20 @@
 from __future__ import annotations
 
+import cProfile
+import hashlib
 import io
 import json
 import math
-from dataclasses import dataclass
+import multiprocessing
+import pstats
+import re
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, replace
 from pathlib import Path
-from typing import Any, Callable
+from typing import Any, Callable, Iterator
 
 import fitz
 from pptx import Presentation
@@ -13,12 +22,59 @@ from pptx.dml.color import RGBColor
 from pptx.enum.shapes import MSO_AUTO_SHAPE_TYPE
 from pptx.util import Inches, Pt
 
+try:
+    from .graph_store import write_page_graph
+    from .slides import copy_slide_content, merge_presentations
+except ImportError:
+    from graph_store import write_page_graph
+    from slides import copy_slide_content, merge_presentations
+
 
 ProgressCallback = Callable[[int, str, dict[str, Any] | None], None]
 
 SLIDE_WIDTH_IN = 13.333
 SLIDE_HEIGHT_IN = 7.5
 MIN_SHAPE_IN = 0.03
+PROFILE_TOP_N = 25
+FALLBACK_ZOOM = 2.0
+BACKGROUND_ICON_PADDING_PT = 0.5
+# MuPDF bounds stroked paths by line width * miter limit (PDF default limit: 10)
+# when deciding whether a redaction covers them.
+DEFAULT_MITER_LIMIT = 10.0
+# Rough sizes for the icon cost model, measured on python-pptx output and
+# PyMuPDF PNG clips of typical icon art.
+SHAPE_XML_BYTES = 600
+POINT_XML_BYTES = 43
+PNG_BYTES_PER_PIXEL = 0.16
+PNG_OVERHEAD_BYTES = 700
+ICON_POLICIES = ("auto", "vector", "raster")
+ICON_RESULT_COUNTERS = {
+    "vector": "vector_icons_ok",
+    "fallback_image": "vector_icons_fallback",
+    "raster_image": "raster_icons",
+}
+MEMORY_TOP_N = 10
+_WARNING_PAGE_RE = re.compile(r" on page (\d+) ")
+# Report counters that add up across pages, and therefore across chunks.
+SUMMED_REPORT_KEYS = (
+    "vector_icons_ok",
+    "vector_icons_fallback",
+    "raster_icons",
+    "duplicate_pages",
+    "image_only_pages",
+    "image_only_saved_s_est",
+    "background_layers",
+    "text_count",
+    "image_count",
+)
+# Content-stream operators that can appear on a page that only places images:
+# graphics state, transforms, clipping and XObject invocation. Anything else
+# (text, path painting, shading, inline images) sends the page down the full path.
+IMAGE_ONLY_OPERATORS = frozenset(
+    {b"q", b"Q", b"cm", b"gs", b"Do", b"re", b"W", b"W*", b"n", b"w", b"i", b"ri", b"BDC", b"BMC", b"EMC", b"MP", b"DP"}
+)
+MAX_IMAGE_ONLY_CONTENT_BYTES = 4096
+_CONTENT_OPERATOR_RE = re.compile(rb"(?<![/\w])[A-Za-z'\"][A-Za-z0-9*'\"]*")
 
 
 @dataclass
@@ -30,6 +86,17 @@ class ConversionOptions:
     min_icon_size_pt: float = 8.0
     max_icon_size_pt: float = 220.0
     debug: bool = False
+    pages: str | list[int | str] | None = None
+    icon_policy: str = "auto"
+    icon_xml_budget_bytes: int = 32_000
+    icon_raster_ratio: float = 1.0
+    max_icon_points: int = 4_000
+    build_workers: int = 0
+    chunk_pages: int = 50
+    dedupe_pages: bool = True
+    image_only_fast_path: bool = True
+    image_only_min_coverage: float = 0.9
+    vector_background: bool = False
 
 
 @dataclass
@@ -39,72 +106,242 @@ class JobArtifacts:
     page_graph: dict[str, Any]
 
 
+class StageTimer:
+    """Accumulates wall time per stage, overall and per page.
+
+    Stages must not nest, so that they add up to (nearly) the total; a page's
+    total is the sum of its stages.
+    """
+
+    def __init__(self) -> None:
+        self.totals: dict[str, float] = {}
+        self.pages: dict[int, dict[str, float]] = {}
+        self.chunk_totals: dict[str, float] = {}
+
+    @contextmanager
+    def measure(self, stage: str, page_no: int | None = None) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.totals[stage] = self.totals.get(stage, 0.0) + elapsed
+            if page_no is not None:
+                page_stages = self.pages.setdefault(page_no, {})
+                page_stages[stage] = page_stages.get(stage, 0.0) + elapsed
+
+    def absorb(self, timings: dict[str, Any]) -> None:
+        """Fold in the timings of a chunk converted in another process.
+
+        Chunks run concurrently, so their stage times are kept apart from the
+        wall-clock stages of this process.
+        """
+        for stage, value in timings.get("stages", {}).items():
+            self.chunk_totals[stage] = self.chunk_totals.get(stage, 0.0) + value
+        for page in timings.get("pages", []):
+            page_stages = self.pages.setdefault(page["page_no"], {})
+            for stage, value in page["stages"].items():
+                page_stages[stage] = page_stages.get(stage, 0.0) + value
+
+    def to_report(self, total_s: float) -> dict[str, Any]:
+        report = {
+            "total_s": round(total_s, 6),
+            "stages": {stage: round(value, 6) for stage, value in self.totals.items()},
+            "pages": [
+                {
+                    "page_no": page_no,
+                    "total_s": round(sum(stages.values()), 6),
+                    "stages": {stage: round(value, 6) for stage, value in stages.items()},
+                }
+                for page_no, stages in sorted(self.pages.items())
+            ],
+        }
+        if self.chunk_totals:
+            report["chunk_stages"] = {stage: round(value, 6) for stage, value in self.chunk_totals.items()}
+        return report
+
+
 class PdfToPptConverter:
     def __init__(self, options: ConversionOptions):
         self.options = options
+        self.timer = StageTimer()
+        self._image_only_probe_s: float | None = None
 
     def convert(self, pdf_bytes: bytes, progress: ProgressCallback) -> JobArtifacts:
+        self.timer = StageTimer()
+        started = time.perf_counter()
+
+        profiler = cProfile.Profile() if self.options.debug else None
+        owns_tracemalloc = self.options.debug and not tracemalloc.is_tracing()
+        if owns_tracemalloc:
+            tracemalloc.start()
+        if profiler:
+            profiler.enable()
+
+        try:
+            artifacts = self._convert(pdf_bytes, progress)
+        finally:
+            if profiler:
+                profiler.disable()
+            memory = _tracemalloc_report() if self.options.debug and tracemalloc.is_tracing() else None
+            if owns_tracemalloc:
+                tracemalloc.stop()
+
+        artifacts.report["timings"] = self.timer.to_report(time.perf_counter() - started)
+        if profiler:
+            artifacts.report["profile"] = _profile_report(profiler)
+        if memory:
+            artifacts.report["memory"] = memory
+
+        progress(100, "转换完成", {"report": artifacts.report})
+        return artifacts
+
+    def _convert(self, pdf_bytes: bytes, progress: ProgressCallback) -> JobArtifacts:
         progress(5, "开始解析 PDF", None)
+        self._image_only_probe_s = None
 
-        document = fitz.open(stream=pdf_bytes, filetype="pdf")
+        with self.timer.measure("open"):
+            document = fitz.open(stream=pdf_bytes, filetype="pdf")
         total_pages = len(document)
+        try:
+            selected_pages = parse_page_selection(self.options.pages, total_pages)
+        except ValueError:
+            document.close()
+            raise
+        selected_count = len(selected_pages)
+        if self.options.icon_policy not in ICON_POLICIES:
+            document.close()
+            raise ValueError(f"Unknown icon_policy: {self.options.icon_policy}")
+        if self.options.build_workers > 1 and selected_count > self.options.chunk_pages:
+            document.close()
+            return self._convert_chunked(pdf_bytes, selected_pages, total_pages, progress)
 
-        page_graph: dict[str, Any] = {
-            "pages": [],
-            "version": "1.0",
-            "strategy": "vector-first-with-fallback",
-        }
+        page_graph = _new_page_graph()
         extracted_pages: list[dict[str, Any]] = []
-
-        report: dict[str, Any] = {
-            "total_pages": total_pages,
-            "vector_icons_ok": 0,
-            "vector_icons_fallback": 0,
-            "text_count": 0,
-            "image_count": 0,
-            "warnings": [],
-            "icons": [],
-        }
+        report = _new_report(total_pages, selected_pages)
+        image_only_extracted = 0
+        first_by_fingerprint: dict[str, dict[str, Any]] = {}
 
         try:
-            for index in range(total_pages):
-                page = document[index]
-                page_data = self._extract_page(page, index + 1, document)
+            for index, page_no in enumerate(selected_pages):
+                page = document[page_no - 1]
+                fingerprint = None
+                if self.options.dedupe_pages:
+                    with self.timer.measure("fingerprint", page_no):
+                        fingerprint = _page_fingerprint(document, page)
+
+                first = first_by_fingerprint.get(fingerprint) if fingerprint else None
+                if first:
+                    page_data = _duplicate_page_data(first, page_no)
+                    report["duplicate_pages"] += 1
+                else:
+                    page_data = self._extract_page(page, page_no, document)
+                    if fingerprint:
+                        first_by_fingerprint[fingerprint] = page_data
+                    if page_data["page_graph"].get("classification") == "image_only":
+                        image_only_extracted += 1
+                if page_data["page_graph"].get("classification") == "image_only":
+                    report["image_only_pages"] += 1
                 extracted_pages.append(page_data)
 
                 report["text_count"] += len(page_data["texts"])
                 report["image_count"] += len(page_data["images"])
                 page_graph["pages"].append(page_data["page_graph"])
 
-                extract_progress = 10 + int(((index + 1) / max(total_pages, 1)) * 45)
-                progress(extract_progress, f"提取对象层（{index + 1}/{total_pages}）", None)
+                extract_progress = 10 + int(((index + 1) / max(selected_count, 1)) * 45)
+                progress(extract_progress, f"提取对象层（{index + 1}/{selected_count}）", None)
+
+            if self._image_only_probe_s is not None:
+                # The probed page paid for the full path; every other one skipped it.
+                report["image_only_saved_s_est"] = round(self._image_only_probe_s * (image_only_extracted - 1), 6)
 
             progress(60, "开始写入 PPTX", None)
             pptx_bytes = self._build_pptx(document, extracted_pages, report, progress)
 
             report["warnings"] = sorted(set(report["warnings"]))
-            page_graph["summary"] = {
-                "pages": total_pages,
-                "texts": report["text_count"],
-                "images": report["image_count"],
-                "vector_icons_ok": report["vector_icons_ok"],
-                "vector_icons_fallback": report["vector_icons_fallback"],
-            }
+            page_graph["summary"] = _graph_summary(report)
 
-            progress(100, "转换完成", {"report": report})
             return JobArtifacts(pptx_bytes=pptx_bytes, report=report, page_graph=page_graph)
         finally:
             document.close()
 
+    def _convert_chunked(
+        self,
+        pdf_bytes: bytes,
+        selected_pages: list[int],
+        total_pages: int,
+        progress: ProgressCallback,
+    ) -> JobArtifacts:
+        chunk_size = max(1, self.options.chunk_pages)
+        chunks = [selected_pages[i : i + chunk_size] for i in range(0, len(selected_pages), chunk_size)]
+        chunk_options = [asdict(replace(self.options, pages=chunk, build_workers=0, debug=False)) for chunk in chunks]
+        results: list[tuple[bytes, dict[str, Any], dict[str, Any]] | None] = [None] * len(chunks)
+
+        progress(10, f"并行转换（0/{len(chunks)} 块）", None)
+        with self.timer.measure("parallel_chunks"):
+            with ProcessPoolExecutor(
+                max_workers=min(self.options.build_workers, len(chunks)),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_chunk_worker,
+                initargs=(pdf_bytes,),
+            ) as executor:
+                futures = {executor.submit(_convert_chunk, options): index for index, options in enumerate(chunk_options)}
+                try:
+                    for done, future in enumerate(as_completed(futures), start=1):
+                        results[futures[future]] = future.result()
+                        chunk_progress = 10 + int((done / len(chunks)) * 75)
+                        progress(chunk_progress, f"并行转换（{done}/{len(chunks)} 块）", None)
+                except BaseException:
+                    # Don't start the remaining chunks once the job is going to fail anyway.
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    raise
+
+        progress(88, "合并幻灯片", None)
+        with self.timer.measure("merge"):
+            pptx_bytes = merge_presentations([result[0] for result in results if result])
+
+        report = _new_report(total_pages, selected_pages)
+        report["chunks"] = len(chunks)
+        page_graph = _new_page_graph()
+        for _, chunk_report, chunk_graph in (result for result in results if result):
+            for key in SUMMED_REPORT_KEYS:
+                report[key] += chunk_report[key]
+            report["warnings"].extend(chunk_report["warnings"])
+            report["icons"].extend(chunk_report["icons"])
+            page_graph["pages"].extend(chunk_graph["pages"])
+            self.timer.absorb(chunk_report.get("timings", {}))
+
+        report["image_only_saved_s_est"] = round(report["image_only_saved_s_est"], 6)
+        report["warnings"] = sorted(set(report["warnings"]))
+        page_graph["summary"] = _graph_summary(report)
+        return JobArtifacts(pptx_bytes=pptx_bytes, report=report, page_graph=page_graph)
+
     def _extract_page(self, page: fitz.Page, page_no: int, document: fitz.Document) -> dict[str, Any]:
         page_w = float(page.rect.width)
         page_h = float(page.rect.height)
         page_area = max(1.0, page_w * page_h)
 
+        if self.options.image_only_fast_path:
+            with self.timer.measure("classify_page", page_no):
+                coverage = _image_only_coverage(page, page_area)
+            if coverage is not None and coverage >= self.options.image_only_min_coverage:
+                return self._extract_image_only_page(page, page_no, document, coverage)
+
         texts = self._extract_texts(page, page_w, page_h)
         images = self._extract_images(page, document, page_w, page_h)
-        vectors = self._extract_vectors(page, page_area)
-        icon_candidates = self._build_icon_candidates(vectors, page_w, page_h)
+        drawings = None
+        if self.options.vector_background:
+            with self.timer.measure("extract_vectors", page_no):
+                drawings = page.get_drawings()
+        vectors = self._extract_vectors(page, page_area, drawings)
+        with self.timer.measure("cluster_vectors", page_no):
+            icon_candidates = self._build_icon_candidates(vectors, page_w, page_h)
+
+        # Paths that are neither emitted as icons nor anywhere else: page-sized
+        # backgrounds, lines, art outside the icon size range.
+        background_paths = 0
+        if drawings is not None:
+            background_paths = len(drawings) - sum(len(icon["paths"]) for icon in icon_candidates)
 
         page_graph = {
             "page_no": page_no,
@@ -115,6 +352,10 @@ class PdfToPptConverter:
             "vectors": [self._vector_for_graph(v) for v in vectors],
             "icons": [self._icon_for_graph(icon) for icon in icon_candidates],
         }
+        if self.options.image_only_fast_path:
+            page_graph["classification"] = "standard"
+        if self.options.vector_background:
+            page_graph["background_paths"] = background_paths
 
         return {
             "page_no": page_no,
@@ -124,10 +365,60 @@ class PdfToPptConverter:
             "images": images,
             "vectors": vectors,
             "icons": icon_candidates,
+            "background_paths": background_paths,
+            "page_graph": page_graph,
+        }
+
+    def _extract_image_only_page(
+        self,
+        page: fitz.Page,
+        page_no: int,
+        document: fitz.Document,
+        coverage: float,
+    ) -> dict[str, Any]:
+        """Extract a page that only places images (e.g. a scan): no text, drawing or icon passes."""
+        page_w = float(page.rect.width)
+        page_h = float(page.rect.height)
+
+        probe_s = None
+        if self._image_only_probe_s is None:
+            # Time the skipped passes once so the report can estimate the saving.
+            with self.timer.measure("image_only_probe", page_no):
+                started = time.perf_counter()
+                page.get_text("dict")
+                page.get_drawings()
+                probe_s = self._image_only_probe_s = time.perf_counter() - started
+
+        images = self._extract_images(page, document, page_w, page_h)
+        page_graph = {
+            "page_no": page_no,
+            "width_pt": page_w,
+            "height_pt": page_h,
+            "classification": "image_only",
+            "image_coverage": round(coverage, 4),
+            "texts": [],
+            "images": [self._image_for_graph(i) for i in images],
+            "vectors": [],
+            "icons": [],
+        }
+        if probe_s is not None:
+            page_graph["image_only_probe_s"] = round(probe_s, 6)
+        return {
+            "page_no": page_no,
+            "page_w": page_w,
+            "page_h": page_h,
+            "texts": [],
+            "images": images,
+            "vectors": [],
+            "icons": [],
             "page_graph": page_graph,
         }
 
     def _extract_texts(self, page: fitz.Page, page_w: float, page_h: float) -> list[dict[str, Any]]:
+        with self.timer.measure("extract_texts", page.number + 1):
+            return self._collect_texts(page, page_w, page_h)
+
+    def _collect_texts(self, page: fitz.Page, page_w: float, page_h: float) -> list[dict[str, Any]]:
         text_dict = page.get_text("dict")
         texts: list[dict[str, Any]] = []
 
@@ -161,6 +452,16 @@ class PdfToPptConverter:
         document: fitz.Document,
         page_w: float,
         page_h: float,
+    ) -> list[dict[str, Any]]:
+        with self.timer.measure("extract_images", page.number + 1):
+            return self._collect_images(page, document, page_w, page_h)
+
+    def _collect_images(
+        self,
+        page: fitz.Page,
+        document: fitz.Document,
+        page_w: float,
+        page_h: float,
     ) -> list[dict[str, Any]]:
         images: list[dict[str, Any]] = []
         image_defs = page.get_images(full=True)
@@ -194,10 +495,26 @@ class PdfToPptConverter:
 
         return images
 
-    def _extract_vectors(self, page: fitz.Page, page_area: float) -> list[dict[str, Any]]:
+    def _extract_vectors(
+        self,
+        page: fitz.Page,
+        page_area: float,
+        drawings: list[dict[str, Any]] | None = None,
+    ) -> list[dict[str, Any]]:
+        with self.timer.measure("extract_vectors", page.number + 1):
+            return self._collect_vectors(page, page_area, drawings)
+
+    def _collect_vectors(
+        self,
+        page: fitz.Page,
+        page_area: float,
+        drawings: list[dict[str, Any]] | None,
+    ) -> list[dict[str, Any]]:
         vectors: list[dict[str, Any]] = []
+        if drawings is None:
+            drawings = page.get_drawings()
 
-        for idx, path in enumerate(page.get_drawings()):
+        for idx, path in enumerate(drawings):
             rect = path.get("rect")
             if not rect:
                 continue
@@ -217,7 +534,7 @@ class PdfToPptConverter:
                     "items": path.get("items", []),
                     "stroke": _normalize_color(path.get("color")),
                     "fill": _normalize_color(path.get("fill")),
-                    "width": float(path.get("width", 0.75)),
+                    "width": float(path.get("width") or 0.75),
                     "close_path": bool(path.get("closePath", False)),
                     "type": str(path.get("type", "")),
                 }
@@ -277,33 +594,80 @@ class PdfToPptConverter:
         blank_layout = presentation.slide_layouts[6]
 
         total_pages = len(extracted_pages)
+        emitted: dict[int, tuple[Any, list[dict[str, Any]]]] = {}
         for index, page_data in enumerate(extracted_pages):
             slide = presentation.slides.add_slide(blank_layout)
+            page_no = page_data["page_no"]
             page_w = page_data["page_w"]
             page_h = page_data["page_h"]
+            write_progress = 60 + int(((index + 1) / max(total_pages, 1)) * 35)
+
+            duplicate_of = page_data.get("duplicate_of")
+            if duplicate_of in emitted:
+                source_slide, source_records = emitted[duplicate_of]
+                with self.timer.measure("copy_duplicate_slide", page_no):
+                    copy_slide_content(source_slide, slide)
+                for record in source_records:
+                    report["icons"].append({**record, "page_no": page_no})
+                    report[ICON_RESULT_COUNTERS[record["result"]]] += 1
+                if page_data.get("background_paths", 0) > 0:
+                    report["background_layers"] += 1
+                progress(write_progress, f"写入幻灯片（{index + 1}/{total_pages}）", None)
+                continue
 
-            for text in page_data["texts"]:
-                self._add_text(slide, text, page_w, page_h)
+            page = document[page_no - 1]
+            if page_data.get("background_paths", 0) > 0:
+                # Added first so it sits beneath every editable object.
+                with self.timer.measure("render_background", page_no):
+                    background_bytes = self._render_vector_background(document, page, page_data["icons"])
+                with self.timer.measure("emit_images", page_no):
+                    self._add_image(slide, background_bytes, (0.0, 0.0, page_w, page_h), page_w, page_h)
+                report["background_layers"] += 1
 
-            for image in page_data["images"]:
-                self._add_image(slide, image["bytes"], image["bbox_pt"], page_w, page_h)
+            with self.timer.measure("emit_texts", page_no):
+                for text in page_data["texts"]:
+                    self._add_text(slide, text, page_w, page_h)
 
-            page = document[page_data["page_no"] - 1]
+            with self.timer.measure("emit_images", page_no):
+                for image in page_data["images"]:
+                    self._add_image(slide, image["bytes"], image["bbox_pt"], page_w, page_h)
+
+            page_icon_records: list[dict[str, Any]] = []
             for icon in page_data["icons"]:
+                with self.timer.measure("estimate_icons", page_no):
+                    estimates = self._estimate_icon_cost(icon)
+                    decision, decision_reason = self._choose_icon_output(estimates)
+
                 icon_record = {
                     "page_no": page_data["page_no"],
                     "icon_id": icon["id"],
                     "bbox_pt": list(icon["bbox_pt"]),
                     "result": "vector",
                     "reason": "",
+                    "decision": decision,
+                    "decision_reason": decision_reason,
+                    "estimates": estimates,
                 }
+                if decision == "raster":
+                    with self.timer.measure("rasterize_icons", page_no):
+                        raster_bytes = self._rasterize_clip(page, icon["bbox_pt"])
+                        self._add_image(slide, raster_bytes, icon["bbox_pt"], page_w, page_h)
+                    report["raster_icons"] += 1
+                    icon_record["result"] = "raster_image"
+                    icon_record["reason"] = decision_reason
+                    report["icons"].append(icon_record)
+                    page_icon_records.append(icon_record)
+                    continue
+
                 try:
-                    if not self._add_icon_vector(slide, icon, page_w, page_h):
-                        raise ValueError("vector path unsupported")
+                    with self.timer.measure("emit_vector_icons", page_no):
+                        if not self._add_icon_vector(slide, icon, page_w, page_h):
+                            raise ValueError("vector path unsupported")
                     report["vector_icons_ok"] += 1
                 except Exception as exc:
-                    fallback_bytes = self._rasterize_clip(page, icon["bbox_pt"])
-                    self._add_image(slide, fallback_bytes, icon["bbox_pt"], page_w, page_h)
+                    with self.timer.measure("rasterize_fallback", page_no):
+                        fallback_bytes = self._rasterize_clip(page, icon["bbox_pt"])
+                        self._add_image(slide, fallback_bytes, icon["bbox_pt"], page_w, page_h)
                     report["vector_icons_fallback"] += 1
                     icon_record["result"] = "fallback_image"
                     icon_record["reason"] = str(exc)
@@ -312,14 +676,57 @@ class PdfToPptConverter:
                     )
 
                 report["icons"].append(icon_record)
+                page_icon_records.append(icon_record)
 
-            write_progress = 60 + int(((index + 1) / max(total_pages, 1)) * 35)
+            emitted[page_no] = (slide, page_icon_records)
             progress(write_progress, f"写入幻灯片（{index + 1}/{total_pages}）", None)
 
         output_stream = io.BytesIO()
-        presentation.save(output_stream)
+        with self.timer.measure("save"):
+            presentation.save(output_stream)
         return output_stream.getvalue()
 
+    def _estimate_icon_cost(self, icon: dict[str, Any]) -> dict[str, Any]:
+        point_count = 0
+        for path in icon["paths"]:
+            items = path.get("items", [])
+            if len(items) == 1 and _item_op(items[0]) == "re":
+                point_count += 4
+                continue
+            # Cached for _draw_vector_path so emission does not flatten twice.
+            if "flattened" not in path:
+                path["flattened"] = _flatten_path_to_points(
+                    items,
+                    path.get("close_path", False),
+                    self.options.vector_tolerance_pt,
+                )
+            point_count += len(path["flattened"][0])
+
+        x0, y0, x1, y1 = icon["bbox_pt"]
+        pixels = max(1.0, (x1 - x0) * FALLBACK_ZOOM) * max(1.0, (y1 - y0) * FALLBACK_ZOOM)
+        return {
+            "path_count": len(icon["paths"]),
+            "point_count": point_count,
+            "xml_bytes": SHAPE_XML_BYTES * len(icon["paths"]) + POINT_XML_BYTES * point_count,
+            "png_bytes": int(PNG_OVERHEAD_BYTES + pixels * PNG_BYTES_PER_PIXEL),
+        }
+
+    def _choose_icon_output(self, estimates: dict[str, Any]) -> tuple[str, str]:
+        policy = self.options.icon_policy
+        if policy == "vector":
+            return "vector", "policy=vector"
+        if policy == "raster":
+            return "raster", "policy=raster"
+
+        if estimates["point_count"] > self.options.max_icon_points:
+            return "raster", f"{estimates['point_count']} points exceed max_icon_points"
+        if (
+            estimates["xml_bytes"] > self.options.icon_xml_budget_bytes
+            and estimates["xml_bytes"] > estimates["png_bytes"] * self.options.icon_raster_ratio
+        ):
+            return "raster", "estimated XML exceeds budget and PNG size"
+        return "vector", "within vector budget"
+
     def _add_text(self, slide, text: dict[str, Any], page_w: float, page_h: float) -> None:
         x0, y0, x1, y1 = text["bbox_pt"]
         left, top, width, height = _pdf_bbox_to_inches((x0, y0, x1, y1), page_w, page_h)
@@ -384,7 +791,10 @@ class PdfToPptConverter:
             self._draw_rectangle(slide, rect, page_w, page_h, path)
             return True
 
-        points, closed = _flatten_path_to_points(items, path.get("close_path", False), self.options.vector_tolerance_pt)
+        flattened = path.get("flattened")
+        if flattened is None:
+            flattened = _flatten_path_to_points(items, path.get("close_path", False), self.options.vector_tolerance_pt)
+        points, closed = flattened
         if len(points) < 2:
             return False
 
@@ -433,9 +843,43 @@ class PdfToPptConverter:
 
     def _rasterize_clip(self, page: fitz.Page, bbox_pt: tuple[float, float, float, float]) -> bytes:
         rect = fitz.Rect(*bbox_pt)
-        pix = page.get_pixmap(clip=rect, alpha=True, matrix=fitz.Matrix(2, 2))
+        pix = page.get_pixmap(clip=rect, alpha=True, matrix=fitz.Matrix(FALLBACK_ZOOM, FALLBACK_ZOOM))
         return pix.tobytes("png")
 
+    def _render_vector_background(
+        self,
+        document: fitz.Document,
+        page: fitz.Page,
+        icons: list[dict[str, Any]],
+    ) -> bytes:
+        """Render the page's vector art without its text, images and icons as one transparent PNG."""
+        with fitz.open() as scratch:
+            scratch.insert_pdf(document, from_page=page.number, to_page=page.number)
+            scratch_page = scratch[0]
+
+            # Text and images are emitted as their own objects.
+            scratch_page.add_redact_annot(scratch_page.rect, fill=False)
+            scratch_page.apply_redactions(
+                images=fitz.PDF_REDACT_IMAGE_REMOVE,
+                graphics=fitz.PDF_REDACT_LINE_ART_NONE,
+            )
+
+            # Icon paths lie inside their cluster's bbox plus the stroke allowance;
+            # larger art crossing it is only partly covered and therefore kept.
+            if icons:
+                for icon in icons:
+                    line_width = max(path["width"] for path in icon["paths"])
+                    pad = BACKGROUND_ICON_PADDING_PT + line_width * DEFAULT_MITER_LIMIT
+                    rect = fitz.Rect(*icon["bbox_pt"])
+                    scratch_page.add_redact_annot(rect + (-pad, -pad, pad, pad), fill=False)
+                scratch_page.apply_redactions(
+                    images=fitz.PDF_REDACT_IMAGE_NONE,
+                    graphics=fitz.PDF_REDACT_LINE_ART_REMOVE_IF_COVERED,
+                )
+
+            pix = scratch_page.get_pixmap(alpha=True, matrix=fitz.Matrix(FALLBACK_ZOOM, FALLBACK_ZOOM))
+            return pix.tobytes("png")
+
     def _text_for_graph(self, text: dict[str, Any]) -> dict[str, Any]:
         return {
             "text": text["text"],
@@ -472,6 +916,183 @@ class PdfToPptConverter:
         }
 
 
+def _new_report(total_pages: int, selected_pages: list[int]) -> dict[str, Any]:
+    report: dict[str, Any] = {
+        "total_pages": total_pages,
+        "converted_pages": len(selected_pages),
+        "slide_pages": selected_pages,
+    }
+    report.update({key: 0 for key in SUMMED_REPORT_KEYS})
+    report["image_only_saved_s_est"] = 0.0
+    report["warnings"] = []
+    report["icons"] = []
+    return report
+
+
+def _new_page_graph() -> dict[str, Any]:
+    return {"pages": [], "version": "1.0", "strategy": "vector-first-with-fallback"}
+
+
+def _graph_summary(report: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "pages": report["converted_pages"],
+        "texts": report["text_count"],
+        "images": report["image_count"],
+        "vector_icons_ok": report["vector_icons_ok"],
+        "vector_icons_fallback": report["vector_icons_fallback"],
+        "raster_icons": report["raster_icons"],
+        "duplicate_pages": report["duplicate_pages"],
+        "image_only_pages": report["image_only_pages"],
+        "image_only_saved_s_est": report["image_only_saved_s_est"],
+        "background_layers": report["background_layers"],
+    }
+
+
+def _page_fingerprint(document: fitz.Document, page: fitz.Page) -> str:
+    """Hash of everything that determines a page's output: geometry, content stream and resources."""
+    digest = hashlib.sha1()
+    digest.update(repr((tuple(page.rect), page.rotation)).encode("utf-8"))
+    digest.update(page.read_contents())
+    digest.update(repr(document.xref_get_key(page.xref, "Resources")).encode("utf-8"))
+    # Resolved lists also cover resources inherited from the page tree.
+    digest.update(repr(page.get_images(full=True)).encode("utf-8"))
+    digest.update(repr(page.get_fonts(full=True)).encode("utf-8"))
+    digest.update(repr(page.get_xobjects()).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _image_only_coverage(page: fitz.Page, page_area: float) -> float | None:
+    """Return the share of the page covered by images if the page does nothing but place images.
+
+    Only the content stream's operators are inspected, so this is cheap; ``None``
+    means the page has other content (or content we cannot vouch for).
+    """
+    contents = page.read_contents()
+    if not contents or len(contents) > MAX_IMAGE_ONLY_CONTENT_BYTES:
+        return None
+    operators = set(_CONTENT_OPERATOR_RE.findall(contents))
+    if b"Do" not in operators or not operators <= IMAGE_ONLY_OPERATORS:
+        return None
+    # ``Do`` on a form XObject could draw anything.
+    if page.get_xobjects():
+        return None
+
+    page_rect = page.rect
+    placements = set()
+    for xref in {img_def[0] for img_def in page.get_images(full=True)}:
+        for rect in page.get_image_rects(xref):
+            clipped = fitz.Rect(rect) & page_rect
+            if not clipped.is_empty:
+                placements.add(tuple(round(value, 2) for value in clipped))
+    covered = sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in placements)
+    return min(1.0, covered / page_area)
+
+
+def _duplicate_page_data(first: dict[str, Any], page_no: int) -> dict[str, Any]:
+    return {
+        **first,
+        "page_no": page_no,
+        "duplicate_of": first["page_no"],
+        "page_graph": {**first["page_graph"], "page_no": page_no, "duplicate_of": first["page_no"]},
+    }
+
+
+_chunk_pdf_bytes = b""
+
+
+def _init_chunk_worker(pdf_bytes: bytes) -> None:
+    # Ship the PDF once per worker process rather than once per chunk task.
+    global _chunk_pdf_bytes
+    _chunk_pdf_bytes = pdf_bytes
+
+
+def _convert_chunk(options: dict[str, Any]) -> tuple[bytes, dict[str, Any], dict[str, Any]]:
+    artifacts = PdfToPptConverter(ConversionOptions(**options)).convert(_chunk_pdf_bytes, lambda *_: None)
+    return artifacts.pptx_bytes, artifacts.report, artifacts.page_graph
+
+
+def count_pages(pdf_bytes: bytes) -> int:
+    """Page count of a PDF; raises ValueError if it cannot be opened."""
+    try:
+        with fitz.open(stream=pdf_bytes, filetype="pdf") as document:
+            return len(document)
+    except RuntimeError as exc:  # fitz.FileDataError and friends
+        raise ValueError(f"Cannot open PDF: {exc}") from exc
+
+
+def parse_page_selection(spec: str | list[int | str] | int | None, total_pages: int) -> list[int]:
+    """Turn ``"1-3,5"``, ``[1, "4-6"]`` or ``None`` (all pages) into sorted 1-based page numbers."""
+    if spec is None or spec == "" or spec == []:
+        return list(range(1, total_pages + 1))
+
+    if isinstance(spec, (int, str)):
+        parts: list[int | str] = [spec]
+    else:
+        parts = list(spec)
+
+    selected: set[int] = set()
+    for part in parts:
+        tokens = [part] if isinstance(part, int) else [t.strip() for t in str(part).split(",") if t.strip()]
+        for token in tokens:
+            if isinstance(token, int) and not isinstance(token, bool):
+                start = end = token
+            elif isinstance(token, str) and "-" in token:
+                first, _, last = token.partition("-")
+                start = _parse_page_no(first) if first.strip() else 1
+                end = _parse_page_no(last) if last.strip() else total_pages
+            else:
+                start = end = _parse_page_no(token)
+
+            if start > end:
+                raise ValueError(f"Invalid page range: {token}")
+            if start < 1 or end > total_pages:
+                raise ValueError(f"Page {token} is out of range (document has {total_pages} pages)")
+            selected.update(range(start, end + 1))
+
+    if not selected:
+        raise ValueError("Page selection is empty")
+    return sorted(selected)
+
+
+def _parse_page_no(value: Any) -> int:
+    try:
+        return int(str(value).strip())
+    except ValueError as exc:
+        raise ValueError(f"Invalid page number: {value}") from exc
+
+
+def _profile_report(profiler: cProfile.Profile) -> dict[str, Any]:
+    stats = pstats.Stats(profiler)
+    entries = []
+    for (filename, line, name), (_, ncalls, tottime, cumtime, _) in stats.stats.items():  # type: ignore[attr-defined]
+        entries.append(
+            {
+                "function": f"{Path(filename).name}:{line}({name})",
+                "ncalls": ncalls,
+                "tottime_s": round(tottime, 6),
+                "cumtime_s": round(cumtime, 6),
+            }
+        )
+    entries.sort(key=lambda item: item["cumtime_s"], reverse=True)
+    return {"sort": "cumtime", "top": entries[:PROFILE_TOP_N]}
+
+
+def _tracemalloc_report() -> dict[str, Any]:
+    current, peak = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot()
+    top = []
+    for stat in snapshot.statistics("lineno")[:MEMORY_TOP_N]:
+        frame = stat.traceback[0]
+        top.append(
+            {
+                "location": f"{Path(frame.filename).name}:{frame.lineno}",
+                "size_bytes": stat.size,
+                "count": stat.count,
+            }
+        )
+    return {"current_bytes": current, "peak_bytes": peak, "top": top}
+
+
 def _normalize_bbox(
     bbox: Any,
     page_w: float,
@@ -710,13 +1331,66 @@ def _approximate_cubic_bezier(
     return points
 
 
+def merge_reconverted(
+    parent_report: dict[str, Any],
+    parent_graph: dict[str, Any],
+    report: dict[str, Any],
+    page_graph: dict[str, Any],
+) -> tuple[dict[str, Any], dict[str, Any]]:
+    """Describe a spliced deck: the parent's report and page graph with the reconverted pages replaced.
+
+    ``report`` and ``page_graph`` cover only the reconverted pages; their page
+    numbers are kept as ``reconverted_pages`` and the totals are recomputed
+    over the whole deck. Timings stay those of the reconversion.
+    """
+    reconverted = list(report["slide_pages"])
+    replaced = set(reconverted)
+    slide_pages = list(parent_report["slide_pages"])
+    position = {page_no: index for index, page_no in enumerate(slide_pages)}
+
+    records = {record["page_no"]: record for record in parent_graph["pages"]}
+    records.update({record["page_no"]: record for record in page_graph["pages"]})
+    merged_graph = {key: value for key, value in parent_graph.items() if key not in ("pages", "summary")}
+    merged_graph["pages"] = [records[page_no] for page_no in slide_pages if page_no in records]
+
+    parent_icons = [icon for icon in parent_report.get("icons", []) if icon["page_no"] not in replaced]
+    parent_warnings = [
+        warning
+        for warning in parent_report.get("warnings", [])
+        if not ((match := _WARNING_PAGE_RE.search(warning)) and int(match.group(1)) in replaced)
+    ]
+
+    merged = dict(report)
+    merged["total_pages"] = parent_report["total_pages"]
+    merged["converted_pages"] = parent_report.get("converted_pages", len(slide_pages))
+    merged["slide_pages"] = slide_pages
+    merged["reconverted_pages"] = reconverted
+    merged["icons"] = sorted(parent_icons + report["icons"], key=lambda icon: position.get(icon["page_no"], 0))
+    merged["warnings"] = sorted(set(parent_warnings + report["warnings"]))
+    _recount_report(merged, merged_graph["pages"])
+    merged_graph["summary"] = _graph_summary(merged)
+    return merged, merged_graph
+
+
+def _recount_report(report: dict[str, Any], page_records: list[dict[str, Any]]) -> None:
+    """Recompute the per-page totals of ``report`` from its icon records and page-graph records."""
+    report["text_count"] = sum(len(record.get("texts", [])) for record in page_records)
+    report["image_count"] = sum(len(record.get("images", [])) for record in page_records)
+    for key in ICON_RESULT_COUNTERS.values():
+        report[key] = 0
+    for icon in report["icons"]:
+        report[ICON_RESULT_COUNTERS[icon["result"]]] += 1
+    report["duplicate_pages"] = sum(1 for record in page_records if "duplicate_of" in record)
+    report["image_only_pages"] = sum(1 for record in page_records if record.get("classification") == "image_only")
+    report["background_layers"] = sum(1 for record in page_records if record.get("background_paths", 0) > 0)
+
+
 def write_artifacts(job_dir: Path, artifacts: JobArtifacts) -> tuple[Path, Path, Path]:
     pptx_path = job_dir / "output.pptx"
     report_path = job_dir / "report.json"
-    graph_path = job_dir / "page_graph.json"
 
     pptx_path.write_bytes(artifacts.pptx_bytes)
     report_path.write_text(json.dumps(artifacts.report, ensure_ascii=False, indent=2), encoding="utf-8")
-    graph_path.write_text(json.dumps(artifacts.page_graph, ensure_ascii=False, indent=2), encoding="utf-8")
+    graph_path = write_page_graph(job_dir, artifacts.page_graph)
 
     return pptx_path, report_path, graph_path
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import gzip
+import json
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+
+GRAPH_DATA_NAME = "page_graph.jsonl.gz"
+GRAPH_INDEX_NAME = "page_graph.index.json"
+COMPRESS_LEVEL = 6
+
+
+def write_page_graph(job_dir: Path, page_graph: dict[str, Any]) -> Path:
+    """Store one gzip member per page plus an offset index; return the index path.
+
+    Concatenated gzip members form a valid gzip stream, so the data file also
+    reads as plain JSON lines with ``zcat``.
+    """
+    data_path = job_dir / GRAPH_DATA_NAME
+    index_path = job_dir / GRAPH_INDEX_NAME
+
+    entries = []
+    offset = 0
+    with data_path.open("wb") as handle:
+        for page in page_graph.get("pages", []):
+            record = json.dumps(page, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+            member = gzip.compress(record, compresslevel=COMPRESS_LEVEL, mtime=0)
+            handle.write(member)
+            entries.append({"page_no": page["page_no"], "offset": offset, "length": len(member)})
+            offset += len(member)
+
+    header = {key: value for key, value in page_graph.items() if key != "pages"}
+    index = {"data": GRAPH_DATA_NAME, "header": header, "pages": entries}
+    index_path.write_text(json.dumps(index, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    return index_path
+
+
+def read_page_graph_index(index_path: Path) -> dict[str, Any]:
+    return json.loads(index_path.read_text(encoding="utf-8"))
+
+
+def read_page_graph(index_path: Path) -> dict[str, Any]:
+    """Load the whole page graph back into its in-memory shape."""
+    index = read_page_graph_index(index_path)
+    page_nos = [entry["page_no"] for entry in index["pages"]]
+    pages = [json.loads(record) for record in iter_page_records(index_path, index, page_nos)]
+    return {**index["header"], "pages": pages}
+
+
+def iter_page_records(index_path: Path, index: dict[str, Any], page_nos: Iterable[int]) -> Iterator[bytes]:
+    """Yield the compact JSON of each requested page that exists in the graph, in order."""
+    entries = {entry["page_no"]: entry for entry in index["pages"]}
+    with (index_path.parent / index["data"]).open("rb") as handle:
+        for page_no in page_nos:
+            entry = entries.get(page_no)
+            if not entry:
+                continue
+            handle.seek(entry["offset"])
+            yield gzip.decompress(handle.read(entry["length"])).rstrip(b"\n")
+
+
+def stream_page_graph(index_path: Path, index: dict[str, Any], page_nos: Iterable[int]) -> Iterator[bytes]:
+    """Yield a JSON document shaped like the in-memory page graph, one page at a time."""
+    header = json.dumps(index["header"], ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    yield header[:-1] + (b',"pages":[' if len(header) > 2 else b'"pages":[')
+
+    for position, record in enumerate(iter_page_records(index_path, index, page_nos)):
+        yield record if position == 0 else b"," + record
+
+    yield b"]}"
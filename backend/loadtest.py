@@ -0,0 +1,400 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+try:
+    import httpx
+except ImportError:  # only this tool needs httpx
+    httpx = None
+
+try:
+    from .benchmark import GENERATORS
+except ImportError:
+    from benchmark import GENERATORS
+
+
+CREATE_ENDPOINT = "POST /api/v1/jobs"
+STATUS_ENDPOINT = "GET /api/v1/jobs/{id}"
+DOWNLOAD_ENDPOINT = "GET /api/v1/jobs/{id}/download"
+ENDPOINTS = (CREATE_ENDPOINT, STATUS_ENDPOINT, DOWNLOAD_ENDPOINT)
+PERCENTILES = (50, 95, 99)
+SERVER_START_TIMEOUT_S = 60.0
+RSS_METRICS = {
+    "pdf2pptx_process_resident_memory_bytes": "server_rss_bytes",
+    "pdf2pptx_worker_resident_memory_bytes": "workers_rss_bytes",
+}
+
+
+@dataclass
+class EndpointStats:
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+    bytes: int = 0
+
+    def record(self, elapsed: float, ok: bool, size: int = 0) -> None:
+        self.latencies.append(elapsed)
+        self.bytes += size
+        if not ok:
+            self.errors += 1
+
+    def summary(self, elapsed_s: float) -> dict[str, Any]:
+        count = len(self.latencies)
+        result: dict[str, Any] = {
+            "requests": count,
+            "errors": self.errors,
+            "error_rate": round(self.errors / count, 4) if count else 0.0,
+            "throughput_rps": round(count / elapsed_s, 3) if elapsed_s > 0 else 0.0,
+            "bytes": self.bytes,
+        }
+        for pct in PERCENTILES:
+            result[f"p{pct}_s"] = round(percentile(self.latencies, pct), 4) if count else None
+        return result
+
+
+@dataclass
+class LoadResult:
+    endpoints: dict[str, EndpointStats] = field(default_factory=lambda: {name: EndpointStats() for name in ENDPOINTS})
+    job_durations: list[float] = field(default_factory=list)
+    job_outcomes: dict[str, int] = field(default_factory=dict)
+    rss_samples: list[dict[str, Any]] = field(default_factory=list)
+
+    def count_outcome(self, outcome: str) -> None:
+        self.job_outcomes[outcome] = self.job_outcomes.get(outcome, 0) + 1
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    rank = max(1, min(len(ordered), int(-(-pct * len(ordered) // 100))))
+    return ordered[rank - 1]
+
+
+def parse_mix(spec: str) -> list[tuple[str, float]]:
+    """Parse ``"text_dense:3,image_heavy:1"`` into generator names with weights."""
+    mix = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, weight = part.partition(":")
+        if name not in GENERATORS:
+            raise ValueError(f"Unknown PDF case: {name} (choose from {', '.join(sorted(GENERATORS))})")
+        mix.append((name, float(weight) if weight else 1.0))
+    if not mix:
+        raise ValueError("PDF mix is empty")
+    return mix
+
+
+def parse_metrics_text(text: str) -> dict[str, float]:
+    """Sum the samples of the RSS metrics in a Prometheus text exposition."""
+    values: dict[str, float] = {}
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        name_part, _, value = line.rpartition(" ")
+        name = name_part.split("{", 1)[0]
+        if name in RSS_METRICS:
+            key = RSS_METRICS[name]
+            values[key] = values.get(key, 0.0) + float(value)
+    return values
+
+
+async def run_job(
+    client: "httpx.AsyncClient",
+    pdf_name: str,
+    pdf_bytes: bytes,
+    options: dict[str, Any],
+    result: LoadResult,
+    poll_interval: float,
+    job_timeout: float,
+) -> None:
+    started = time.perf_counter()
+    files = {"file": (f"{pdf_name}.pdf", pdf_bytes, "application/pdf")}
+    data = {"options": json.dumps(options)}
+    response = await _timed(client, result, CREATE_ENDPOINT, "POST", "/api/v1/jobs", files=files, data=data)
+    if response is None or response.status_code != 200:
+        result.count_outcome("create_failed")
+        return
+    job_id = response.json()["jobId"]
+
+    while True:
+        if time.perf_counter() - started > job_timeout:
+            result.count_outcome("timeout")
+            return
+        await asyncio.sleep(poll_interval)
+        response = await _timed(client, result, STATUS_ENDPOINT, "GET", f"/api/v1/jobs/{job_id}")
+        if response is None or response.status_code != 200:
+            continue
+        status = response.json()["status"]
+        if status == "failed":
+            result.count_outcome("failed")
+            return
+        if status == "done":
+            break
+
+    response = await _timed(client, result, DOWNLOAD_ENDPOINT, "GET", f"/api/v1/jobs/{job_id}/download")
+    if response is None or response.status_code != 200:
+        result.count_outcome("download_failed")
+        return
+    result.job_durations.append(time.perf_counter() - started)
+    result.count_outcome("done")
+
+
+async def _timed(
+    client: "httpx.AsyncClient",
+    result: LoadResult,
+    endpoint: str,
+    method: str,
+    url: str,
+    **kwargs: Any,
+) -> "httpx.Response | None":
+    started = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+    except httpx.HTTPError:
+        result.endpoints[endpoint].record(time.perf_counter() - started, ok=False)
+        return None
+    result.endpoints[endpoint].record(
+        time.perf_counter() - started,
+        ok=response.is_success,
+        size=len(response.content),
+    )
+    return response
+
+
+async def sample_rss(client: "httpx.AsyncClient", result: LoadResult, interval: float, started: float) -> None:
+    while True:
+        try:
+            response = await client.get("/metrics")
+            if response.is_success:
+                sample: dict[str, Any] = {"t_s": round(time.perf_counter() - started, 3)}
+                sample.update({key: int(value) for key, value in parse_metrics_text(response.text).items()})
+                result.rss_samples.append(sample)
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(interval)
+
+
+async def run_load(
+    base_url: str,
+    pdfs: dict[str, bytes],
+    mix: list[tuple[str, float]],
+    jobs: int,
+    concurrency: int,
+    options: dict[str, Any],
+    poll_interval: float,
+    job_timeout: float,
+    sample_interval: float,
+    seed: int,
+) -> tuple[LoadResult, float]:
+    """Run ``jobs`` upload/poll/download cycles with ``concurrency`` of them in flight at a time."""
+    rng = random.Random(seed)
+    names = [name for name, _ in mix]
+    weights = [weight for _, weight in mix]
+    schedule = rng.choices(names, weights=weights, k=jobs)
+
+    result = LoadResult()
+    queue: asyncio.Queue[str] = asyncio.Queue()
+    for name in schedule:
+        queue.put_nowait(name)
+
+    limits = httpx.Limits(max_connections=concurrency + 2)
+    async with httpx.AsyncClient(base_url=base_url, timeout=job_timeout, limits=limits) as client:
+
+        async def user() -> None:
+            while True:
+                try:
+                    name = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                await run_job(client, name, pdfs[name], options, result, poll_interval, job_timeout)
+
+        started = time.perf_counter()
+        sampler = asyncio.create_task(sample_rss(client, result, sample_interval, started))
+        try:
+            await asyncio.gather(*(user() for _ in range(max(1, concurrency))))
+        finally:
+            sampler.cancel()
+            try:
+                await sampler
+            except asyncio.CancelledError:
+                pass
+        elapsed = time.perf_counter() - started
+
+    return result, elapsed
+
+
+def summarize(result: LoadResult, elapsed: float, config: dict[str, Any]) -> dict[str, Any]:
+    endpoints = {name: stats.summary(elapsed) for name, stats in result.endpoints.items()}
+    requests = sum(stats["requests"] for stats in endpoints.values())
+    errors = sum(stats["errors"] for stats in endpoints.values())
+    jobs: dict[str, Any] = {
+        "outcomes": dict(sorted(result.job_outcomes.items())),
+        "throughput_jobs_per_s": round(len(result.job_durations) / elapsed, 4) if elapsed > 0 else 0.0,
+    }
+    for pct in PERCENTILES:
+        jobs[f"p{pct}_s"] = round(percentile(result.job_durations, pct), 4) if result.job_durations else None
+
+    rss_peaks = {}
+    for key in RSS_METRICS.values():
+        values = [sample[key] for sample in result.rss_samples if key in sample]
+        if values:
+            rss_peaks[key] = max(values)
+
+    return {
+        "version": "1.0",
+        "config": config,
+        "elapsed_s": round(elapsed, 3),
+        "requests": requests,
+        "errors": errors,
+        "error_rate": round(errors / requests, 4) if requests else 0.0,
+        "endpoints": endpoints,
+        "jobs": jobs,
+        "rss_peak": rss_peaks,
+        "rss_samples": result.rss_samples,
+    }
+
+
+def start_server(host: str, port: int, workers: int | None) -> subprocess.Popen:
+    env = dict(os.environ)
+    if workers is not None:
+        env["PDF2PPTX_WORKERS"] = str(workers)
+    command = [sys.executable, "-m", "uvicorn", "main:app", "--host", host, "--port", str(port), "--log-level", "warning"]
+    process = subprocess.Popen(command, cwd=Path(__file__).resolve().parent, env=env)
+
+    deadline = time.monotonic() + SERVER_START_TIMEOUT_S
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited during start-up with code {process.returncode}")
+        try:
+            if httpx.get(f"http://{host}:{port}/api/v1/health", timeout=1.0).is_success:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+
+    stop_server(process)
+    raise RuntimeError(f"Server did not become healthy within {SERVER_START_TIMEOUT_S}s")
+
+
+def stop_server(process: subprocess.Popen) -> None:
+    process.terminate()
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def _print_summary(summary: dict[str, Any]) -> None:
+    print(
+        f"{summary['requests']} requests in {summary['elapsed_s']:.1f}s, "
+        f"error rate {summary['error_rate']:.2%}, jobs {summary['jobs']['outcomes']}"
+    )
+    for name, stats in summary["endpoints"].items():
+        latency = ", ".join(
+            f"p{pct} {stats[f'p{pct}_s'] * 1000:.1f}ms" for pct in PERCENTILES if stats[f"p{pct}_s"] is not None
+        )
+        print(
+            f"  {name:<32} {stats['requests']:>6} req  {stats['throughput_rps']:>8.2f} req/s  "
+            f"errors {stats['errors']:<4} {latency}"
+        )
+    jobs = summary["jobs"]
+    if jobs["p50_s"] is not None:
+        print(
+            f"  {'job end-to-end':<32} {jobs['throughput_jobs_per_s']:.3f} jobs/s  "
+            + ", ".join(f"p{pct} {jobs[f'p{pct}_s']:.2f}s" for pct in PERCENTILES)
+        )
+    for key, value in summary["rss_peak"].items():
+        print(f"  peak {key}: {value / 1024 / 1024:.1f} MiB")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Drive the job API with concurrent uploads, polling and downloads.")
+    parser.add_argument("--url", help="Base URL of a running service; by default a local server is started")
+    parser.add_argument("--host", default="127.0.0.1", help="Host of the server started by this tool")
+    parser.add_argument("--port", type=int, default=8765, help="Port of the server started by this tool")
+    parser.add_argument("--server-workers", type=int, help="PDF2PPTX_WORKERS for the server started by this tool")
+    parser.add_argument("--jobs", type=int, default=20, help="Total jobs to submit")
+    parser.add_argument("--concurrency", type=int, default=4, help="Jobs in flight at the same time")
+    parser.add_argument("--mix", default="text_dense:2,image_heavy:1,many_small_vectors:1", help="case:weight,...")
+    parser.add_argument("--scale", type=float, default=0.25, help="Multiply the default page count of every case")
+    parser.add_argument("--options", default="{}", help="Conversion options JSON sent with every job")
+    parser.add_argument("--poll-interval", type=float, default=0.5)
+    parser.add_argument("--job-timeout", type=float, default=300.0)
+    parser.add_argument("--sample-interval", type=float, default=1.0, help="Seconds between /metrics RSS samples")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", type=Path, help="Write results as JSON to this file")
+    parser.add_argument("--max-error-rate", type=float, default=0.0, help="Exit with 1 above this request error rate")
+    args = parser.parse_args(argv)
+
+    if httpx is None:
+        parser.error("the load generator needs httpx: pip install httpx")
+    try:
+        mix = parse_mix(args.mix)
+        options = json.loads(args.options)
+    except (ValueError, json.JSONDecodeError) as exc:
+        parser.error(str(exc))
+
+    pdfs = {}
+    for name, _ in mix:
+        generator, default_pages = GENERATORS[name]
+        pdfs[name] = generator(max(1, int(round(default_pages * args.scale))), args.seed)
+
+    server = None
+    base_url = args.url
+    if not base_url:
+        server = start_server(args.host, args.port, args.server_workers)
+        base_url = f"http://{args.host}:{args.port}"
+
+    config = {
+        "url": base_url,
+        "jobs": args.jobs,
+        "concurrency": args.concurrency,
+        "mix": dict(mix),
+        "pdf_bytes": {name: len(data) for name, data in pdfs.items()},
+        "options": options,
+        "poll_interval_s": args.poll_interval,
+    }
+    try:
+        result, elapsed = asyncio.run(
+            run_load(
+                base_url,
+                pdfs,
+                mix,
+                args.jobs,
+                args.concurrency,
+                options,
+                args.poll_interval,
+                args.job_timeout,
+                args.sample_interval,
+                args.seed,
+            )
+        )
+    finally:
+        if server:
+            stop_server(server)
+
+    summary = summarize(result, elapsed, config)
+    _print_summary(summary)
+    if args.output:
+        args.output.write_text(json.dumps(summary, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    if summary["error_rate"] > args.max_error_rate:
+        print(f"Error rate {summary['error_rate']:.2%} is above {args.max_error_rate:.2%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
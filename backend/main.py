@@ -4,25 +4,71 @@ import asyncio
 import json
 import threading
 import traceback
+from contextlib import asynccontextmanager
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, AsyncIterator
 from uuid import uuid4
 
-from fastapi import FastAPI, File, Form, HTTPException, UploadFile
+from fastapi import FastAPI, File, Form, HTTPException, Query, Request, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
 
 try:
-    from .converter import ConversionOptions, PdfToPptConverter, write_artifacts
+    from .converter import count_pages, parse_page_selection
+    from .graph_store import read_page_graph_index, stream_page_graph
+    from .metrics import (
+        BYTES_BUCKETS,
+        DURATION_BUCKETS,
+        PAGE_BUCKETS,
+        RATIO_BUCKETS,
+        Counter,
+        Gauge,
+        Histogram,
+        Registry,
+        current_rss_bytes,
+    )
+    from .thumbnails import (
+        THUMBNAIL_MEDIA_TYPES,
+        etag_matches,
+        get_or_render_thumbnail,
+        page_count,
+        page_sizes,
+        snap_thumbnail_width,
+        thumbnail_etag,
+    )
+    from .workers import WorkerJobError, WorkerPool, pool_from_env, run_conversion_task
 except ImportError:
-    from converter import ConversionOptions, PdfToPptConverter, write_artifacts
+    from converter import count_pages, parse_page_selection
+    from graph_store import read_page_graph_index, stream_page_graph
+    from metrics import (
+        BYTES_BUCKETS,
+        DURATION_BUCKETS,
+        PAGE_BUCKETS,
+        RATIO_BUCKETS,
+        Counter,
+        Gauge,
+        Histogram,
+        Registry,
+        current_rss_bytes,
+    )
+    from thumbnails import (
+        THUMBNAIL_MEDIA_TYPES,
+        etag_matches,
+        get_or_render_thumbnail,
+        page_count,
+        page_sizes,
+        snap_thumbnail_width,
+        thumbnail_etag,
+    )
+    from workers import WorkerJobError, WorkerPool, pool_from_env, run_conversion_task
 
 
 APP_ROOT = Path(__file__).resolve().parent
 JOB_ROOT = APP_ROOT / ".jobs"
 JOB_ROOT.mkdir(parents=True, exist_ok=True)
+THUMBNAIL_CACHE_CONTROL = "private, max-age=604800, immutable"
 
 
 @dataclass
@@ -42,6 +88,8 @@ class JobState:
     report_path: Path | None = None
     graph_path: Path | None = None
     traceback_text: str | None = None
+    options: dict[str, Any] = field(default_factory=dict)
+    parent_job_id: str | None = None
 
     def to_public(self) -> dict[str, Any]:
         return {
@@ -54,10 +102,28 @@ class JobState:
             "error": self.error,
             "createdAt": self.created_at,
             "updatedAt": self.updated_at,
+            "parentJobId": self.parent_job_id,
         }
 
 
-app = FastAPI(title="Local High Precision PDF->PPTX API", version="1.0.0")
+_worker_pool: WorkerPool | None = None
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    global _worker_pool
+    _worker_pool = pool_from_env()
+    if _worker_pool:
+        _worker_pool.start()
+    try:
+        yield
+    finally:
+        if _worker_pool:
+            await asyncio.to_thread(_worker_pool.stop)
+            _worker_pool = None
+
+
+app = FastAPI(title="Local High Precision PDF->PPTX API", version="1.0.0", lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -68,12 +134,108 @@ app.add_middleware(
 _jobs: dict[str, JobState] = {}
 _jobs_lock = threading.Lock()
 
+JOB_STATUSES = ("queued", "running", "done", "failed")
+
+
+registry = Registry()
+jobs_finished_total = registry.register(
+    Counter("pdf2pptx_jobs_finished_total", "Jobs that finished, by final status.", ["status"])
+)
+jobs_current = registry.register(
+    Gauge(
+        "pdf2pptx_jobs",
+        "Jobs currently known to the service, by status.",
+        ["status"],
+        collect=lambda: _collect_jobs_by_status(),
+    )
+)
+queue_depth = registry.register(
+    Gauge("pdf2pptx_queue_depth", "Jobs waiting to start.", collect=lambda: _collect_queue_depth())
+)
+conversion_duration = registry.register(
+    Histogram("pdf2pptx_conversion_duration_seconds", "End-to-end conversion time of finished jobs.", DURATION_BUCKETS)
+)
+stage_seconds_total = registry.register(
+    Counter("pdf2pptx_stage_seconds_total", "Time spent per converter stage.", ["stage"])
+)
+pages_processed_total = registry.register(
+    Counter("pdf2pptx_pages_processed_total", "Pages converted by successful jobs.")
+)
+job_pages = registry.register(
+    Histogram("pdf2pptx_job_pages", "Pages per successful job.", PAGE_BUCKETS)
+)
+icons_total = registry.register(
+    Counter("pdf2pptx_icons_total", "Icon candidates emitted, by result.", ["result"])
+)
+icon_fallback_ratio = registry.register(
+    Histogram("pdf2pptx_icon_fallback_ratio", "Share of icons per job that fell back to images.", RATIO_BUCKETS)
+)
+output_bytes = registry.register(
+    Histogram("pdf2pptx_output_bytes", "Size of generated pptx files.", BYTES_BUCKETS)
+)
+registry.register(
+    Gauge("pdf2pptx_process_resident_memory_bytes", "Resident memory of the API process.", collect=lambda: _collect_rss())
+)
+registry.register(
+    Gauge("pdf2pptx_workers", "Live conversion worker processes.", collect=lambda: _collect_worker_stat("alive"))
+)
+registry.register(
+    Counter(
+        "pdf2pptx_worker_exits_total",
+        "Worker processes replaced, by reason.",
+        ["reason"],
+        collect=lambda: _collect_worker_stat("exits"),
+    )
+)
+registry.register(
+    Gauge(
+        "pdf2pptx_worker_resident_memory_bytes",
+        "Resident memory of each worker after its last job.",
+        ["slot"],
+        collect=lambda: _collect_worker_stat("rss"),
+    )
+)
+
+
+def _collect_jobs_by_status() -> dict[tuple[str, ...], float]:
+    counts: dict[tuple[str, ...], float] = {(status,): 0.0 for status in JOB_STATUSES}
+    with _jobs_lock:
+        for state in _jobs.values():
+            counts[(state.status,)] = counts.get((state.status,), 0.0) + 1
+    return counts
+
+
+def _collect_queue_depth() -> dict[tuple[str, ...], float]:
+    with _jobs_lock:
+        return {(): float(sum(1 for state in _jobs.values() if state.status == "queued"))}
+
+
+def _collect_rss() -> dict[tuple[str, ...], float]:
+    rss = current_rss_bytes()
+    return {(): float(rss)} if rss is not None else {}
+
+
+def _collect_worker_stat(name: str) -> dict[tuple[str, ...], float]:
+    pool = _worker_pool
+    if not pool:
+        return {}
+    if name == "alive":
+        return {(): float(pool.alive)}
+    if name == "exits":
+        return {(reason,): float(count) for reason, count in dict(pool.exits).items()}
+    return {(str(slot),): float(rss) for slot, rss in dict(pool.worker_rss).items()}
+
 
 @app.get("/api/v1/health")
 def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/metrics")
+def metrics() -> PlainTextResponse:
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 @app.post("/api/v1/jobs")
 async def create_job(
     file: UploadFile = File(...),
@@ -89,32 +251,65 @@ async def create_job(
         payload = json.loads(options or "{}")
     except json.JSONDecodeError as exc:
         raise HTTPException(status_code=400, detail=f"Invalid options JSON: {exc}") from exc
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=400, detail="Options must be a JSON object")
 
     pdf_bytes = await file.read()
     if not pdf_bytes:
         raise HTTPException(status_code=400, detail="Empty file")
 
-    job_id = uuid4().hex
-    workdir = JOB_ROOT / job_id
-    workdir.mkdir(parents=True, exist_ok=True)
+    if payload.get("pages") is not None:
+        try:
+            total_pages = await asyncio.to_thread(count_pages, pdf_bytes)
+            parse_page_selection(payload["pages"], total_pages)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
 
-    input_path = workdir / "input.pdf"
-    input_path.write_bytes(pdf_bytes)
+    state = await asyncio.to_thread(_register_job, pdf_bytes, payload)
+    asyncio.create_task(_run_job(state.job_id, payload))
+    return {"jobId": state.job_id}
 
-    state = JobState(
-        job_id=job_id,
-        status="queued",
-        progress=0,
-        stage="排队中",
-        workdir=workdir,
-        input_path=input_path,
-    )
 
-    with _jobs_lock:
-        _jobs[job_id] = state
+@app.post("/api/v1/jobs/{job_id}/reconvert")
+async def reconvert_job(job_id: str, options: str = Form(default="{}")) -> dict[str, str]:
+    parent = _get_job_or_404(job_id)
+    if parent.status != "done" or not all((parent.output_path, parent.report_path, parent.graph_path, parent.input_path)):
+        raise HTTPException(status_code=409, detail="Job is not completed yet")
 
-    asyncio.create_task(_run_job(job_id, pdf_bytes, payload))
-    return {"jobId": job_id}
+    try:
+        payload = json.loads(options or "{}")
+    except json.JSONDecodeError as exc:
+        raise HTTPException(status_code=400, detail=f"Invalid options JSON: {exc}") from exc
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=400, detail="Options must be a JSON object")
+    if not payload.get("pages"):
+        raise HTTPException(status_code=400, detail="Missing pages to reconvert")
+
+    parent_report = await asyncio.to_thread(_read_json, parent.report_path)
+    total_pages = int(parent_report.get("total_pages", 0))
+    slide_pages = list(parent_report.get("slide_pages") or range(1, total_pages + 1))
+    try:
+        pages = parse_page_selection(payload["pages"], total_pages)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    missing = [page_no for page_no in pages if page_no not in slide_pages]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Pages have no slide in job {job_id}: {missing}")
+
+    merged_payload = {**parent.options, **payload, "pages": pages}
+    pdf_bytes = await asyncio.to_thread(parent.input_path.read_bytes)
+    state = await asyncio.to_thread(_register_job, pdf_bytes, merged_payload, job_id)
+    splice = {
+        "parent_job_id": job_id,
+        "base_path": parent.output_path,
+        "report_path": parent.report_path,
+        "graph_path": parent.graph_path,
+        "positions": [slide_pages.index(page_no) for page_no in pages],
+        "slide_pages": slide_pages,
+    }
+    asyncio.create_task(_run_job(state.job_id, merged_payload, splice))
+    return {"jobId": state.job_id}
 
 
 @app.get("/api/v1/jobs/{job_id}")
@@ -123,6 +318,53 @@ def get_job(job_id: str) -> dict[str, Any]:
     return state.to_public()
 
 
+@app.get("/api/v1/jobs/{job_id}/pages")
+def get_pages(job_id: str) -> dict[str, Any]:
+    state = _get_job_or_404(job_id)
+    if not state.input_path or not state.input_path.exists():
+        raise HTTPException(status_code=409, detail="Job input is not available")
+
+    sizes = page_sizes(state.input_path)
+    return {
+        "pageCount": len(sizes),
+        "pages": [
+            {"pageNo": index + 1, "widthPt": width, "heightPt": height}
+            for index, (width, height) in enumerate(sizes)
+        ],
+    }
+
+
+@app.get("/api/v1/jobs/{job_id}/pages/{page_no}/thumbnail")
+def get_page_thumbnail(
+    job_id: str,
+    page_no: int,
+    request: Request,
+    width: int = 320,
+    image_format: str = Query(default="png", alias="format"),
+):
+    state = _get_job_or_404(job_id)
+    if not state.input_path or not state.input_path.exists():
+        raise HTTPException(status_code=409, detail="Job input is not available")
+    if image_format not in THUMBNAIL_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unsupported thumbnail format: {image_format}")
+
+    if not 1 <= page_no <= page_count(state.input_path):
+        raise HTTPException(status_code=404, detail=f"Page {page_no} is out of range")
+
+    width = snap_thumbnail_width(width)
+    etag = thumbnail_etag(state.input_path, page_no, width, image_format)
+    headers = {"ETag": etag, "Cache-Control": THUMBNAIL_CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    try:
+        path = get_or_render_thumbnail(state.input_path, state.workdir / "thumbnails", page_no, width, image_format)
+    except IndexError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+
+    return FileResponse(path=path, media_type=THUMBNAIL_MEDIA_TYPES[image_format], headers=headers)
+
+
 @app.get("/api/v1/jobs/{job_id}/download")
 def download_job(job_id: str):
     state = _get_job_or_404(job_id)
@@ -145,41 +387,88 @@ def get_report(job_id: str):
 
 
 @app.get("/api/v1/jobs/{job_id}/page-graph")
-def get_page_graph(job_id: str):
+def get_page_graph(job_id: str, page: int | None = None, pages: str | None = None):
     state = _get_job_or_404(job_id)
     if state.status != "done" or not state.graph_path or not state.graph_path.exists():
         raise HTTPException(status_code=409, detail="Page graph is not ready")
-    return JSONResponse(content=json.loads(state.graph_path.read_text(encoding="utf-8")))
-
-
-async def _run_job(job_id: str, pdf_bytes: bytes, payload: dict[str, Any]) -> None:
-    option_keys = {
-        "mode",
-        "vector_tolerance_pt",
-        "cluster_gap_pt",
-        "background_filter_ratio",
-        "min_icon_size_pt",
-        "max_icon_size_pt",
-        "debug",
-    }
-    option_values = {k: payload[k] for k in option_keys if k in payload}
-    options = ConversionOptions(**option_values)
-    converter = PdfToPptConverter(options)
 
-    _update_job(job_id, status="running", stage="启动任务", progress=1)
+    index = read_page_graph_index(state.graph_path)
+    available = [entry["page_no"] for entry in index["pages"]]
+    spec = pages if pages is not None else page
+    if spec is None:
+        selected = available
+    else:
+        try:
+            requested = parse_page_selection(spec, page_count(state.input_path))
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+        available_set = set(available)
+        selected = [page_no for page_no in requested if page_no in available_set]
+        if not selected:
+            raise HTTPException(status_code=404, detail="Requested pages are not in the page graph")
+
+    return StreamingResponse(stream_page_graph(state.graph_path, index, selected), media_type="application/json")
+
+
+def _read_json(path: Path) -> Any:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _register_job(pdf_bytes: bytes, payload: dict[str, Any], parent_job_id: str | None = None) -> JobState:
+    job_id = uuid4().hex
+    workdir = JOB_ROOT / job_id
+    workdir.mkdir(parents=True, exist_ok=True)
+
+    input_path = workdir / "input.pdf"
+    input_path.write_bytes(pdf_bytes)
+
+    state = JobState(
+        job_id=job_id,
+        status="queued",
+        progress=0,
+        stage="排队中",
+        workdir=workdir,
+        input_path=input_path,
+        options=dict(payload),
+        parent_job_id=parent_job_id,
+    )
+
+    with _jobs_lock:
+        _jobs[job_id] = state
+    return state
+
+
+async def _run_job(
+    job_id: str,
+    payload: dict[str, Any],
+    splice: dict[str, Any] | None = None,
+) -> None:
+    state = _get_job_or_404(job_id)
+    task = {
+        "job_id": job_id,
+        "workdir": state.workdir,
+        "input_path": state.input_path,
+        "payload": payload,
+        "splice": splice,
+    }
+    loop = asyncio.get_running_loop()
 
     def progress_callback(value: int, stage: str, metrics: dict[str, Any] | None) -> None:
         _update_job(
             job_id,
+            status="running",
             progress=max(0, min(100, int(value))),
             stage=stage,
             metrics=metrics or {},
         )
 
     try:
-        artifacts = await asyncio.to_thread(converter.convert, pdf_bytes, progress_callback)
-        state = _get_job_or_404(job_id)
-        output_path, report_path, graph_path = await asyncio.to_thread(write_artifacts, state.workdir, artifacts)
+        if _worker_pool:
+            result = await asyncio.wrap_future(_worker_pool.submit(task, progress_callback), loop=loop)
+        else:
+            result = await asyncio.to_thread(run_conversion_task, task, progress_callback)
+        report = result["report"]
+        _observe_finished_job(report, result["pptx_size"])
 
         _update_job(
             job_id,
@@ -187,25 +476,60 @@ async def _run_job(job_id: str, pdf_bytes: bytes, payload: dict[str, Any]) -> No
             progress=100,
             stage="完成",
             metrics={
-                "vector_icons_ok": artifacts.report.get("vector_icons_ok", 0),
-                "vector_icons_fallback": artifacts.report.get("vector_icons_fallback", 0),
-                "text_count": artifacts.report.get("text_count", 0),
-                "image_count": artifacts.report.get("image_count", 0),
+                "vector_icons_ok": report.get("vector_icons_ok", 0),
+                "vector_icons_fallback": report.get("vector_icons_fallback", 0),
+                "text_count": report.get("text_count", 0),
+                "image_count": report.get("image_count", 0),
+                "duration_s": report.get("timings", {}).get("total_s", 0.0),
+                "stage_timings_s": report.get("timings", {}).get("stages", {}),
             },
-            warnings=list(artifacts.report.get("warnings", [])),
-            output_path=output_path,
-            report_path=report_path,
-            graph_path=graph_path,
+            warnings=list(report.get("warnings", [])),
+            output_path=result["output_path"],
+            report_path=result["report_path"],
+            graph_path=result["graph_path"],
         )
     except Exception as exc:
+        traceback_text = exc.traceback_text if isinstance(exc, WorkerJobError) else None
         _update_job(
             job_id,
             status="failed",
             stage="失败",
             error=str(exc),
-            traceback_text=traceback.format_exc(),
+            traceback_text=traceback_text or traceback.format_exc(),
             progress=100,
         )
+        jobs_finished_total.inc(status="failed")
+
+
+def _observe_finished_job(report: dict[str, Any], pptx_size: int) -> None:
+    timings = report.get("timings", {})
+    conversion_duration.observe(float(timings.get("total_s", 0.0)))
+    for stage, seconds in timings.get("stages", {}).items():
+        stage_seconds_total.inc(float(seconds), stage=stage)
+
+    # A reconverted job's report describes the whole spliced deck; count only the work it did.
+    reconverted = report.get("reconverted_pages")
+    if reconverted is None:
+        pages = int(report.get("converted_pages", report.get("total_pages", 0)))
+        icons = report.get("icons", [])
+    else:
+        pages = len(reconverted)
+        reconverted_set = set(reconverted)
+        icons = [icon for icon in report.get("icons", []) if icon["page_no"] in reconverted_set]
+    pages_processed_total.inc(pages)
+    job_pages.observe(pages)
+
+    results = [icon.get("result") for icon in icons]
+    vector_ok = results.count("vector")
+    fallback = results.count("fallback_image")
+    icons_total.inc(vector_ok, result="vector")
+    icons_total.inc(fallback, result="fallback_image")
+    icons_total.inc(results.count("raster_image"), result="raster_image")
+    if vector_ok + fallback:
+        icon_fallback_ratio.observe(fallback / (vector_ok + fallback))
+
+    output_bytes.observe(pptx_size)
+    jobs_finished_total.inc(status="done")
 
 
 def _get_job_or_404(job_id: str) -> JobState:
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import copy
+import io
+
+from pptx import Presentation
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.oxml.ns import qn
+
+
+REL_ATTRIBUTES = (qn("r:embed"), qn("r:link"), qn("r:id"))
+BLANK_LAYOUT_INDEX = 6
+
+
+def copy_slide_content(source_slide, target_slide) -> None:
+    """Replace the shapes of ``target_slide`` with copies of ``source_slide``'s shapes.
+
+    Works across presentations: related images are re-added to the target package,
+    where python-pptx deduplicates them by content hash.
+    """
+    source_tree = source_slide.shapes._spTree
+    target_tree = target_slide.shapes._spTree
+
+    # The first two children are the group's nvGrpSpPr/grpSpPr and must stay.
+    for element in list(target_tree)[2:]:
+        target_tree.remove(element)
+
+    rel_map: dict[str, str] = {}
+    for element in list(source_tree)[2:]:
+        cloned = copy.deepcopy(element)
+        for node in cloned.iter():
+            for attribute in REL_ATTRIBUTES:
+                rId = node.get(attribute)
+                if not rId:
+                    continue
+                if rId not in rel_map:
+                    rel_map[rId] = _copy_relationship(source_slide.part, target_slide.part, rId)
+                node.set(attribute, rel_map[rId])
+        target_tree.append(cloned)
+
+    _drop_unreferenced_image_rels(target_slide.part)
+
+
+def splice_slides(base_pptx: bytes, patch_pptx: bytes, positions: list[int]) -> bytes:
+    """Return ``base_pptx`` with slide ``positions[i]`` replaced by slide ``i`` of ``patch_pptx``."""
+    base = Presentation(io.BytesIO(base_pptx))
+    patch = Presentation(io.BytesIO(patch_pptx))
+
+    patch_slides = list(patch.slides)
+    if len(patch_slides) != len(positions):
+        raise ValueError(f"Expected {len(positions)} regenerated slides, got {len(patch_slides)}")
+
+    base_slides = list(base.slides)
+    for source_slide, position in zip(patch_slides, positions):
+        if not 0 <= position < len(base_slides):
+            raise ValueError(f"Slide index {position} is out of range")
+        copy_slide_content(source_slide, base_slides[position])
+
+    output_stream = io.BytesIO()
+    base.save(output_stream)
+    return output_stream.getvalue()
+
+
+def merge_presentations(parts: list[bytes]) -> bytes:
+    """Append the slides of every part after those of the first one, in order.
+
+    Slides are created from the first part's blank layout; identical images
+    across parts end up as a single media part.
+    """
+    if not parts:
+        raise ValueError("Nothing to merge")
+
+    merged = Presentation(io.BytesIO(parts[0]))
+    blank_layout = merged.slide_layouts[BLANK_LAYOUT_INDEX]
+    for part in parts[1:]:
+        for source_slide in Presentation(io.BytesIO(part)).slides:
+            copy_slide_content(source_slide, merged.slides.add_slide(blank_layout))
+
+    output_stream = io.BytesIO()
+    merged.save(output_stream)
+    return output_stream.getvalue()
+
+
+def _copy_relationship(source_part, target_part, rId: str) -> str:
+    rel = source_part.rels[rId]
+    if rel.is_external:
+        return target_part.relate_to(rel.target_ref, rel.reltype, is_external=True)
+    if rel.reltype == RT.IMAGE:
+        _, new_rId = target_part.get_or_add_image_part(io.BytesIO(rel.target_part.blob))
+        return new_rId
+    raise ValueError(f"Unsupported relationship type on slide: {rel.reltype}")
+
+
+def _drop_unreferenced_image_rels(part) -> None:
+    referenced = set(part._element.xpath("//@r:embed | //@r:link | //@r:id"))
+    for rId, rel in list(part.rels.items()):
+        if rel.reltype == RT.IMAGE and rId not in referenced:
+            part.drop_rel(rId)
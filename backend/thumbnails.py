@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import os
+import threading
+from pathlib import Path
+
+import fitz
+from PIL import Image
+
+
+THUMBNAIL_MEDIA_TYPES = {"png": "image/png", "webp": "image/webp"}
+# Requested widths are rounded up to one of these, which bounds the cache to
+# len(THUMBNAIL_WIDTHS) files per page and format.
+THUMBNAIL_WIDTHS = (160, 320, 640, 1280)
+WEBP_QUALITY = 80
+
+_render_locks: dict[Path, threading.Lock] = {}
+_render_locks_guard = threading.Lock()
+
+
+def snap_thumbnail_width(width: int) -> int:
+    for size in THUMBNAIL_WIDTHS:
+        if int(width) <= size:
+            return size
+    return THUMBNAIL_WIDTHS[-1]
+
+
+def page_sizes(pdf_path: Path) -> list[tuple[float, float]]:
+    with fitz.open(pdf_path) as document:
+        return [(float(page.rect.width), float(page.rect.height)) for page in document]
+
+
+def page_count(pdf_path: Path) -> int:
+    with fitz.open(pdf_path) as document:
+        return len(document)
+
+
+def thumbnail_etag(pdf_path: Path, page_no: int, width: int, image_format: str) -> str:
+    stat = pdf_path.stat()
+    key = f"{stat.st_size}:{stat.st_mtime_ns}:{page_no}:{width}:{image_format}"
+    return '"' + hashlib.sha1(key.encode("utf-8")).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Whether an ``If-None-Match`` header lists ``etag`` (weak comparison) or is ``*``."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def get_or_render_thumbnail(
+    pdf_path: Path,
+    cache_dir: Path,
+    page_no: int,
+    width: int,
+    image_format: str,
+) -> Path:
+    """Return the cached thumbnail for a page, rendering it on first request."""
+    if image_format not in THUMBNAIL_MEDIA_TYPES:
+        raise ValueError(f"Unsupported thumbnail format: {image_format}")
+    width = snap_thumbnail_width(width)
+
+    target = cache_dir / f"p{page_no}_w{width}.{image_format}"
+    if target.exists():
+        return target
+
+    with _lock_for(target):
+        if target.exists():
+            return target
+
+        data = _render(pdf_path, page_no, width, image_format)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        partial = target.with_name(f"{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        partial.write_bytes(data)
+        os.replace(partial, target)
+
+    with _render_locks_guard:
+        _render_locks.pop(target, None)
+    return target
+
+
+def _render(pdf_path: Path, page_no: int, width: int, image_format: str) -> bytes:
+    with fitz.open(pdf_path) as document:
+        if not 1 <= page_no <= len(document):
+            raise IndexError(f"Page {page_no} is out of range")
+        page = document[page_no - 1]
+        zoom = width / max(float(page.rect.width), 1.0)
+        pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+
+    if image_format == "png":
+        return pix.tobytes("png")
+
+    image = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+    output_stream = io.BytesIO()
+    image.save(output_stream, format="WEBP", quality=WEBP_QUALITY)
+    return output_stream.getvalue()
+
+
+def _lock_for(target: Path) -> threading.Lock:
+    with _render_locks_guard:
+        return _render_locks.setdefault(target, threading.Lock())
@@ -0,0 +1,389 @@
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import traceback
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any
+
+import fitz
+from pptx import Presentation
+
+try:
+    from .converter import (
+        ConversionOptions,
+        JobArtifacts,
+        PdfToPptConverter,
+        ProgressCallback,
+        merge_reconverted,
+        write_artifacts,
+    )
+    from .graph_store import read_page_graph
+    from .metrics import current_rss_bytes
+    from .slides import splice_slides
+except ImportError:
+    from converter import (
+        ConversionOptions,
+        JobArtifacts,
+        PdfToPptConverter,
+        ProgressCallback,
+        merge_reconverted,
+        write_artifacts,
+    )
+    from graph_store import read_page_graph
+    from metrics import current_rss_bytes
+    from slides import splice_slides
+
+
+logger = logging.getLogger(__name__)
+
+OPTION_KEYS = {
+    "mode",
+    "vector_tolerance_pt",
+    "cluster_gap_pt",
+    "background_filter_ratio",
+    "min_icon_size_pt",
+    "max_icon_size_pt",
+    "debug",
+    "pages",
+    "icon_policy",
+    "icon_xml_budget_bytes",
+    "icon_raster_ratio",
+    "max_icon_points",
+    "build_workers",
+    "chunk_pages",
+    "dedupe_pages",
+    "image_only_fast_path",
+    "image_only_min_coverage",
+    "vector_background",
+}
+WORKER_START_TIMEOUT_S = 60.0
+WORKER_RESPAWN_DELAY_S = 1.0
+WORKER_MAX_START_FAILURES = 3
+SPLICE_PROGRESS_START = 97
+
+
+class WorkerJobError(RuntimeError):
+    def __init__(self, message: str, traceback_text: str | None = None):
+        super().__init__(message)
+        self.traceback_text = traceback_text
+
+
+def run_conversion_task(task: dict[str, Any], progress: ProgressCallback) -> dict[str, Any]:
+    """Convert one job end to end and write its artifacts into the job directory.
+
+    Runs inside a worker process, or in a thread when the pool is disabled.
+    """
+    progress(1, "启动任务", None)
+    payload = task["payload"]
+    option_values = {k: payload[k] for k in OPTION_KEYS if k in payload}
+    converter = PdfToPptConverter(ConversionOptions(**option_values))
+
+    pdf_bytes = Path(task["input_path"]).read_bytes()
+    if task.get("splice"):
+        artifacts = converter.convert(pdf_bytes, _scaled_progress(progress, SPLICE_PROGRESS_START))
+        progress(SPLICE_PROGRESS_START, "合并幻灯片", None)
+        artifacts = _splice_into_base(artifacts, task["splice"])
+    else:
+        artifacts = converter.convert(pdf_bytes, progress)
+
+    output_path, report_path, graph_path = write_artifacts(Path(task["workdir"]), artifacts)
+    return {
+        "output_path": output_path,
+        "report_path": report_path,
+        "graph_path": graph_path,
+        "pptx_size": len(artifacts.pptx_bytes),
+        "report": artifacts.report,
+    }
+
+
+def _scaled_progress(progress: ProgressCallback, ceiling: int) -> ProgressCallback:
+    """Map the converter's 0-100 onto 0-``ceiling`` so that later steps keep progress increasing."""
+
+    def scaled(value: int, stage: str, metrics: dict[str, Any] | None) -> None:
+        progress(value * ceiling // 100, stage, metrics)
+
+    return scaled
+
+
+def _splice_into_base(artifacts: JobArtifacts, splice: dict[str, Any]) -> JobArtifacts:
+    started = time.perf_counter()
+    base_bytes = Path(splice["base_path"]).read_bytes()
+    artifacts.pptx_bytes = splice_slides(base_bytes, artifacts.pptx_bytes, splice["positions"])
+
+    parent_report = json.loads(Path(splice["report_path"]).read_text(encoding="utf-8"))
+    parent_graph = read_page_graph(Path(splice["graph_path"]))
+    report, artifacts.page_graph = merge_reconverted(parent_report, parent_graph, artifacts.report, artifacts.page_graph)
+    report["parent_job_id"] = splice["parent_job_id"]
+    artifacts.report = report
+    timings = report.setdefault("timings", {"total_s": 0.0, "stages": {}, "pages": []})
+    elapsed = time.perf_counter() - started
+    timings["stages"]["splice"] = round(elapsed, 6)
+    timings["total_s"] = round(timings.get("total_s", 0.0) + elapsed, 6)
+    return artifacts
+
+
+class WorkerPool:
+    """Fixed number of pre-started conversion processes fed from one task queue.
+
+    Each slot is supervised by a thread that hands the worker one task at a time,
+    relays its progress messages and replaces the process when it retires
+    (job count or RSS limit) or dies.
+    """
+
+    def __init__(self, size: int, max_jobs_per_worker: int = 20, max_rss_bytes: int | None = None):
+        self.size = size
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.max_rss_bytes = max_rss_bytes
+        self.exits: dict[str, int] = {}
+        self.worker_rss: dict[int, int] = {}
+        self._context = multiprocessing.get_context("spawn")
+        self._tasks: queue.Queue = queue.Queue()
+        self._threads: list[threading.Thread] = []
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._alive = 0
+        self._processes: set[Any] = set()
+
+    @property
+    def alive(self) -> int:
+        with self._lock:
+            return self._alive
+
+    def start(self) -> None:
+        # Runs before multiprocessing's own exit handler joins non-daemon children.
+        atexit.register(self.stop)
+        for slot in range(self.size):
+            thread = threading.Thread(target=self._supervise, args=(slot,), name=f"pdf2pptx-worker-{slot}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stopping.set()
+        for _ in self._threads:
+            self._tasks.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads.clear()
+
+        with self._lock:
+            leftovers = list(self._processes)
+        for process in leftovers:
+            if process.is_alive():
+                process.kill()
+                process.join()
+
+    def submit(self, task: dict[str, Any], on_progress: ProgressCallback) -> Future:
+        future: Future = Future()
+        self._tasks.put((task, on_progress, future))
+        return future
+
+    def _supervise(self, slot: int) -> None:
+        worker: tuple[Any, Any] | None = None
+        start_failures = 0
+        try:
+            while not self._stopping.is_set():
+                if worker is None:
+                    worker = self._spawn(slot)
+                    if worker is None:
+                        start_failures += 1
+                        self._count_exit("start_failed")
+                        if start_failures < WORKER_MAX_START_FAILURES:
+                            time.sleep(WORKER_RESPAWN_DELAY_S)
+                        elif not self._fail_next_task(slot, start_failures):
+                            break
+                        continue
+                    start_failures = 0
+
+                item = self._tasks.get()
+                if item is None:
+                    break
+                if not worker[0].is_alive():
+                    # The idle worker died (e.g. OOM-killed); do not hand it the task.
+                    self._reap(worker, "crash")
+                    worker = None
+                    self._tasks.put(item)
+                    continue
+
+                task, on_progress, future = item
+                if not future.set_running_or_notify_cancel():
+                    continue
+
+                exit_reason = self._dispatch(slot, worker, task, on_progress, future)
+                if exit_reason:
+                    self._reap(worker, exit_reason)
+                    worker = None
+        finally:
+            if worker is not None:
+                self._reap(worker, None, graceful=True)
+
+    def _fail_next_task(self, slot: int, attempts: int) -> bool:
+        """Fail the next queued job rather than leave it waiting on a worker that cannot start.
+
+        Each later job gets one more start attempt before failing, so the slot
+        recovers once the cause is fixed. Returns False when the pool is stopping.
+        """
+        if attempts == WORKER_MAX_START_FAILURES:
+            logger.error("Worker %s failed to start %s times in a row; failing queued jobs", slot, attempts)
+        item = self._tasks.get()
+        if item is None:
+            return False
+        _, _, future = item
+        if future.set_running_or_notify_cancel():
+            future.set_exception(WorkerJobError(f"Conversion worker could not be started ({attempts} attempts)"))
+        return True
+
+    def _spawn(self, slot: int) -> tuple[Any, Any] | None:
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(child_conn, self.max_jobs_per_worker, self.max_rss_bytes),
+            name=f"pdf2pptx-worker-{slot}",
+            # Not a daemon so that the chunked build can start its own processes.
+            daemon=False,
+        )
+        try:
+            process.start()
+        except Exception:
+            logger.exception("Failed to start worker %s", slot)
+            parent_conn.close()
+            child_conn.close()
+            return None
+        child_conn.close()
+
+        if not parent_conn.poll(WORKER_START_TIMEOUT_S):
+            logger.error("Worker %s did not start within %ss", slot, WORKER_START_TIMEOUT_S)
+            process.kill()
+            parent_conn.close()
+            return None
+        try:
+            parent_conn.recv()
+        except EOFError:
+            process.join(1.0)
+            logger.error("Worker %s exited during start-up with code %s", slot, process.exitcode)
+            parent_conn.close()
+            return None
+
+        with self._lock:
+            self._alive += 1
+            self._processes.add(process)
+        return process, parent_conn
+
+    def _dispatch(
+        self,
+        slot: int,
+        worker: tuple[Any, Any],
+        task: dict[str, Any],
+        on_progress: ProgressCallback,
+        future: Future,
+    ) -> str | None:
+        process, conn = worker
+        try:
+            conn.send(("run", task))
+            while True:
+                message = conn.recv()
+                kind = message[0]
+                if kind == "progress":
+                    _safe_progress(on_progress, *message[1:])
+                    continue
+
+                _, payload, exit_reason, rss = message
+                if rss:
+                    self.worker_rss[slot] = rss
+                if kind == "done":
+                    future.set_result(payload)
+                else:
+                    message_text, traceback_text = payload
+                    future.set_exception(WorkerJobError(message_text, traceback_text))
+                return exit_reason
+        except (EOFError, OSError, BrokenPipeError):
+            process.join(1.0)
+            future.set_exception(WorkerJobError(f"Worker process exited unexpectedly (exit code {process.exitcode})"))
+            return "crash"
+
+    def _reap(self, worker: tuple[Any, Any], reason: str | None, graceful: bool = False) -> None:
+        process, conn = worker
+        if graceful:
+            try:
+                conn.send(("stop", None))
+            except (OSError, BrokenPipeError):
+                pass
+        process.join(5.0)
+        if process.is_alive():
+            process.kill()
+            process.join()
+        conn.close()
+
+        with self._lock:
+            self._alive -= 1
+            self._processes.discard(process)
+        if reason:
+            self._count_exit(reason)
+
+    def _count_exit(self, reason: str) -> None:
+        with self._lock:
+            self.exits[reason] = self.exits.get(reason, 0) + 1
+
+
+def _safe_progress(on_progress: ProgressCallback, value: int, stage: str, metrics: dict[str, Any] | None) -> None:
+    try:
+        on_progress(value, stage, metrics)
+    except Exception:
+        logger.exception("Progress callback failed")
+
+
+def _worker_main(conn, max_jobs: int, max_rss_bytes: int | None) -> None:
+    _warm_up()
+    conn.send(("ready", os.getpid()))
+
+    completed = 0
+    while True:
+        try:
+            command, task = conn.recv()
+        except EOFError:
+            return
+        if command == "stop":
+            return
+
+        def progress(value: int, stage: str, metrics: dict[str, Any] | None) -> None:
+            conn.send(("progress", value, stage, metrics))
+
+        try:
+            outcome: tuple[str, Any] = ("done", run_conversion_task(task, progress))
+        except Exception as exc:
+            outcome = ("error", (str(exc), traceback.format_exc()))
+
+        completed += 1
+        rss = current_rss_bytes()
+        exit_reason = None
+        if completed >= max_jobs:
+            exit_reason = "max_jobs"
+        elif max_rss_bytes and rss and rss > max_rss_bytes:
+            exit_reason = "max_rss"
+
+        conn.send((outcome[0], outcome[1], exit_reason, rss))
+        if exit_reason:
+            return
+
+
+def _warm_up() -> None:
+    # Loads MuPDF and the default pptx template once, before the first job.
+    fitz.open().close()
+    Presentation()
+
+
+def pool_from_env(environ: dict[str, str] | None = None) -> WorkerPool | None:
+    environ = dict(os.environ if environ is None else environ)
+    size = int(environ.get("PDF2PPTX_WORKERS", min(2, os.cpu_count() or 1)))
+    if size <= 0:
+        return None
+    max_jobs = int(environ.get("PDF2PPTX_WORKER_MAX_JOBS", 20))
+    max_rss_mb = int(environ.get("PDF2PPTX_WORKER_MAX_RSS_MB", 1024))
+    return WorkerPool(size, max_jobs_per_worker=max(1, max_jobs), max_rss_bytes=max_rss_mb * 1024 * 1024 or None)